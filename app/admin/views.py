@@ -3,28 +3,57 @@
 
 
 
-from fastapi import FastAPI
+from functools import partial
+from typing import Any, List
+import uuid
+
+from fastapi import FastAPI, Request
 from sqladmin import Admin, ModelView
+from sqladmin.pagination import Pagination
+from sqlalchemy import CompoundSelect, Select, func, literal, null, select, union_all
 
 from app.auth.models import RefreshSessionModel, UserModel, ProfileModel
 from app.finance.models import BaseTypeModel, CurrencyModel, ExpenseModel, ExpenseTypeModel, IncomeModel, IncomeTypeModel
-from app.utils.database.database import engine
+from app.utils.database.database import engine, shard_router, shard_session
 from app.admin.auth import authentication_backend
+from app.utils.cache import service_cache
+from app.dao.estimates import approximate_count
+from app.data.config import settings
+
+AGGREGATE_CHUNK_SIZE = 5_000
 
 class BaseAdmin(ModelView):
     page_size = 25
     page_size_options = [25, 50, 100, 200]
+    approximate_count = False
+
+    async def count(self, request: Request, stmt: Select | None = None) -> int:
+        if not self.approximate_count or stmt is not None:
+            return await super().count(request, stmt)
+        async with self.session_maker() as session:
+            return await approximate_count(
+                session, self.model, threshold=settings.APPROXIMATE_COUNT_THRESHOLD
+            )
 
 class UsersAdmin(BaseAdmin, model=UserModel):
     column_list = [
         UserModel.email,
         UserModel.profiles,
-        UserModel.incomes,
-        UserModel.expencies,
+        "incomes_count",
+        "incomes_total",
+        "expencies_count",
+        "expencies_total",
         UserModel.income_types,
         UserModel.expense_types,
-        UserModel.refresh_sessions
+        "refresh_sessions_count"
     ]
+    column_labels = {
+        "incomes_count": "incomes",
+        "incomes_total": "incomes total",
+        "expencies_count": "expencies",
+        "expencies_total": "expencies total",
+        "refresh_sessions_count": "refresh sessions"
+    }
     column_details_exclude_list = [UserModel.hashed_password]
     column_searchable_list = [UserModel.email]
     name = "user"
@@ -32,6 +61,102 @@ class UsersAdmin(BaseAdmin, model=UserModel):
     icon = "fa-solid fa-user fa-xl"
     can_delete = False
     column_default_sort = [(UserModel.email, True)]
+    if shard_router.enabled:
+        # relationships into the shards cannot be joined from the control database
+        column_list = [
+            UserModel.email,
+            "incomes_count",
+            "incomes_total",
+            "expencies_count",
+            "expencies_total",
+            "refresh_sessions_count"
+        ]
+        column_details_exclude_list = [
+            UserModel.hashed_password,
+            *(relationship.key for relationship in UserModel.__mapper__.relationships)
+        ]
+
+    async def list(self, request: Request) -> Pagination:
+        pagination = await super().list(request)
+        await self._attach_aggregates(pagination.rows)
+        return pagination
+
+    async def get_model_objects(self, request: Request, limit: int | None = 0) -> List[Any]:
+        rows = await super().get_model_objects(request, limit)
+        await self._attach_aggregates(rows)
+        return rows
+
+    async def after_model_change(self, data: dict, model: Any, is_created: bool) -> None:
+        await service_cache.invalidate_tags(f"user:{model.id}")
+
+    async def _attach_aggregates(self, users: List[UserModel]) -> None:
+        aggregates = {
+            user.id: {
+                "incomes_count": 0,
+                "incomes_total": {},
+                "expencies_count": 0,
+                "expencies_total": {},
+                "refresh_sessions_count": 0
+            }
+            for user in users
+        }
+        if aggregates:
+            rows = await self._fetch_aggregates(users)
+            for user_id, table, currency_code, count, total in rows:
+                user_aggregates = aggregates[user_id]
+                user_aggregates[f"{table}_count"] += count
+                if currency_code is not None:
+                    user_aggregates[f"{table}_total"][currency_code] = total
+
+        for user in users:
+            for name, value in aggregates[user.id].items():
+                if isinstance(value, dict):
+                    value = ", ".join(f"{total} {code}" for code, total in value.items())
+                setattr(user, name, value)
+
+    async def _fetch_aggregates(self, users: List[UserModel]) -> List[tuple]:
+        by_database: dict[int | None, List[uuid.UUID]] = {}
+        for user in users:
+            by_database.setdefault(user.shard, []).append(user.id)
+
+        rows = []
+        for shard, shard_user_ids in by_database.items():
+            session_maker = self.session_maker if shard is None else partial(shard_session, shard)
+            async with session_maker() as session:
+                # exports pass every user: the ids are bound three times per statement,
+                # so chunk them to stay under asyncpg's 32767 parameters
+                for i in range(0, len(shard_user_ids), AGGREGATE_CHUNK_SIZE):
+                    chunk = shard_user_ids[i:i + AGGREGATE_CHUNK_SIZE]
+                    result = await session.execute(self._aggregates_statement(chunk))
+                    rows.extend(result.all())
+        return rows
+
+    @staticmethod
+    def _aggregates_statement(user_ids: List[uuid.UUID]) -> CompoundSelect:
+        finance_aggregates = [
+            select(
+                model.user_id,
+                literal(model.__tablename__),
+                model.currency_code,
+                func.count(),
+                func.sum(model.value)
+            )
+            .where(model.user_id.in_(user_ids))
+            .group_by(model.user_id, model.currency_code)
+            for model in (IncomeModel, ExpenseModel)
+        ]
+        sessions_aggregate = (
+            select(
+                RefreshSessionModel.user_id,
+                literal(RefreshSessionModel.__tablename__),
+                null(),
+                func.count(),
+                null()
+            )
+            .where(RefreshSessionModel.user_id.in_(user_ids))
+            .group_by(RefreshSessionModel.user_id)
+        )
+        return union_all(*finance_aggregates, sessions_aggregate)
 
 class ProfileAdmin(BaseAdmin, model=ProfileModel):
     column_list = [
@@ -81,6 +206,7 @@ class IncomeAdmin(BaseAdmin, model=IncomeModel):
         IncomeModel.category,
         IncomeModel.comment
     ]
+    approximate_count = True
     name = "income item"
     name_plural = "incomes"
     icon = "fa-solid fa-hand-holding-dollar fa-xl"
@@ -93,6 +219,7 @@ class ExpenseAdmin(BaseAdmin, model=ExpenseModel):
         ExpenseModel.category,
         ExpenseModel.comment
     ]
+    approximate_count = True
     name = "expense item"
     name_plural = "expencies"
     icon = "fa-solid fa-credit-card fa-xl"
@@ -114,6 +241,11 @@ admin_views = [
     RefreshSessionAdmin
 ]
 
+# sqladmin reads through a single engine, so the views over sharded tables
+# are left out while sharding is enabled
+if shard_router.enabled:
+    admin_views = [UsersAdmin, CurrencyAdmin]
+
 def init_views(app: FastAPI) -> None:
     admin = Admin(
         app=app,
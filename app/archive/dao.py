@@ -0,0 +1,71 @@
+from datetime import datetime
+import uuid
+
+from sqlalchemy import Subquery, delete, func, insert, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.dao.base import BaseDAO
+from app.finance.models import ExpenseModel, IncomeModel
+from app.utils.database.replicas import mark_written
+from .models import ArchivedExpenseModel, ArchivedIncomeModel
+
+
+class ArchiveDAO(BaseDAO):
+    hot_model = None
+
+    @classmethod
+    def _columns(cls) -> list[str]:
+        return [c.name for c in cls.model.__table__.c if c.name != "archived_at"]
+
+    @classmethod
+    async def move_older_than(
+        cls, session: AsyncSession, cutoff: datetime, limit: int
+    ) -> int:
+        """Move up to `limit` hot rows created before `cutoff` in one statement."""
+        hot = cls.hot_model.__table__
+        columns = cls._columns()
+        batch = (
+            select(hot.c.id)
+            .where(hot.c.created_at < cutoff)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        moved = (
+            delete(hot)
+            .where(hot.c.id.in_(batch.scalar_subquery()))
+            .returning(*[hot.c[name] for name in columns])
+            .cte("moved")
+        )
+        stmt = insert(cls.model).from_select(
+            columns, select(*[moved.c[name] for name in columns])
+        )
+        mark_written(session)
+        # archiving is not a deletion as far as the sync feed is concerned
+        await session.execute(select(func.set_config("app.archiving", "on", True)))
+        result = await session.execute(stmt)
+        return result.rowcount
+
+    @classmethod
+    async def newest(cls, session: AsyncSession, user_id: uuid.UUID) -> datetime | None:
+        return await session.scalar(
+            select(func.max(cls.model.created_at)).where(cls.model.user_id == user_id)
+        )
+
+    @classmethod
+    def with_hot(cls) -> Subquery:
+        """Hot and archived rows as one relation shaped and named like the hot table."""
+        columns = cls._columns()
+        return union_all(
+            select(*[cls.hot_model.__table__.c[name] for name in columns]),
+            select(*[cls.model.__table__.c[name] for name in columns])
+        ).subquery(cls.hot_model.__tablename__)
+
+
+class ArchivedIncomeDAO(ArchiveDAO):
+    model = ArchivedIncomeModel
+    hot_model = IncomeModel
+
+
+class ArchivedExpenseDAO(ArchiveDAO):
+    model = ArchivedExpenseModel
+    hot_model = ExpenseModel
@@ -0,0 +1,47 @@
+from datetime import datetime
+from decimal import Decimal
+import uuid
+
+from app.utils.database.database import Base
+
+from sqlalchemy import TIMESTAMP, BigInteger, ForeignKey, Index, String, Text
+from sqlalchemy.orm import Mapped, declared_attr, mapped_column
+from sqlalchemy.sql import func
+
+
+class ArchivedTransactionModel(Base):
+    """Cold copy of a finance item, moved out of the hot table by the archival job."""
+    __abstract__ = True
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey('user.id', ondelete="CASCADE"))
+    currency_code: Mapped[str] = mapped_column(String(3))
+    value: Mapped[Decimal]
+    category: Mapped[str]
+    comment: Mapped[str] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True))
+    # kept so a user's data version never goes back when their newest change is archived
+    change_version: Mapped[int] = mapped_column(BigInteger)
+    archived_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True),
+        server_default=func.now()
+    )
+
+    @declared_attr.directive
+    def __table_args__(cls):
+        return (
+            Index(f"ix_archive_{cls.__tablename__}_user_id_created_at", "user_id", "created_at"),
+            Index(
+                f"ix_archive_{cls.__tablename__}_user_id_change_version",
+                "user_id", "change_version"
+            ),
+            {"schema": "archive"}
+        )
+
+
+class ArchivedIncomeModel(ArchivedTransactionModel):
+    __tablename__ = "incomes"
+
+
+class ArchivedExpenseModel(ArchivedTransactionModel):
+    __tablename__ = "expencies"
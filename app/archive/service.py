@@ -0,0 +1,66 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.data.config import settings
+from app.tasks.celery import celery_app
+from .dao import ArchiveDAO, ArchivedExpenseDAO, ArchivedIncomeDAO
+
+logger = logging.getLogger(__name__)
+
+
+class ArchiveService:
+    DAOS: list[type[ArchiveDAO]] = [ArchivedIncomeDAO, ArchivedExpenseDAO]
+
+    @staticmethod
+    async def archived_until(session: AsyncSession, user_id: uuid.UUID) -> datetime | None:
+        """Creation time of the user's newest archived item, None if nothing is archived."""
+        newest = [
+            created_at for created_at in [
+                await dao.newest(session, user_id) for dao in ArchiveService.DAOS
+            ]
+            if created_at is not None
+        ]
+        return max(newest, default=None)
+
+    @staticmethod
+    async def needs_archive(
+        session: AsyncSession, user_id: uuid.UUID, start: datetime | None
+    ) -> bool:
+        """Whether a read from `start` (None: all history) reaches archived rows."""
+        archived_until = await ArchiveService.archived_until(session, user_id)
+        return archived_until is not None and (start is None or start <= archived_until)
+
+    @staticmethod
+    async def archive(cutoff: datetime | None = None) -> dict[str, int]:
+        cutoff = cutoff or datetime.now(timezone.utc) - timedelta(days=settings.ARCHIVE_AFTER_DAYS)
+        moved = {dao.hot_model.__tablename__: 0 for dao in ArchiveService.DAOS}
+        # celery runs each task in a fresh event loop, see StatementService.build
+        for url in settings.DATABASE_SHARD_URLS or [settings.DATABASE_URL]:
+            engine = create_async_engine(url, poolclass=NullPool)
+            session_maker = async_sessionmaker(engine, expire_on_commit=False)
+            try:
+                for dao in ArchiveService.DAOS:
+                    # one short transaction per batch keeps row locks and WAL bursts small
+                    for _ in range(settings.ARCHIVE_MAX_BATCHES):
+                        async with session_maker() as session:
+                            count = await dao.move_older_than(
+                                session, cutoff, settings.ARCHIVE_BATCH_SIZE
+                            )
+                            await session.commit()
+                        moved[dao.hot_model.__tablename__] += count
+                        if count < settings.ARCHIVE_BATCH_SIZE:
+                            break
+            finally:
+                await engine.dispose()
+        logger.info("archived finance items", extra={"moved": moved, "cutoff": cutoff.isoformat()})
+        return moved
+
+
+@celery_app.task
+def archive_transactions():
+    return asyncio.run(ArchiveService.archive())
@@ -1,6 +1,15 @@
+import uuid
+
+from sqlalchemy import ARRAY, String, insert, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
 from app.dao.base import BaseDAO
 from app.auth.models import UserModel
+from app.finance.models import ExpenseTypeModel, IncomeTypeModel
+from app.utils.database.database import shard_router
+from app.utils.database.replicas import mark_written
 from .models import ProfileModel, RefreshSessionModel
 from .schemas import (
     UserCreateDB,
@@ -15,6 +24,70 @@ class UsersDAO(BaseDAO):
 class UserDAO(BaseDAO[UserModel, UserCreateDB, UserUpdateDB]):
     model = UserModel
 
+    @classmethod
+    async def add_with_categories(
+        cls,
+        session: AsyncSession,
+        user_id: uuid.UUID,
+        obj_in: UserCreateDB,
+        income_categories: list[str],
+        expense_categories: list[str],
+        shard: int | None = None
+    ) -> UserModel | None:
+        """Insert the user and both category rows in one statement.
+
+        Returns None when the email is already taken. With sharding enabled the
+        categories live on another database, `shard`, and only the user is
+        inserted: see `add_categories`.
+        """
+        mark_written(session)
+        insert_user = (
+            pg_insert(UserModel)
+            .values(id=user_id, shard=shard, **obj_in.model_dump())
+            .on_conflict_do_nothing(index_elements=[UserModel.email])
+        )
+        if shard_router.enabled:
+            return await session.scalar(insert_user.returning(UserModel))
+
+        new_user = insert_user.returning(*UserModel.__table__.c).cte("new_user")
+        category_inserts = [
+            insert(type_model)
+            .from_select(
+                ["user_id", "categories"],
+                select(new_user.c.id, literal(categories, ARRAY(String)))
+            )
+            .cte(f"new_{type_model.__tablename__}")
+            for type_model, categories in (
+                (IncomeTypeModel, income_categories),
+                (ExpenseTypeModel, expense_categories)
+            )
+        ]
+        stmt = select(aliased(UserModel, new_user)).add_cte(*category_inserts)
+        return await session.scalar(stmt)
+
+    @classmethod
+    async def add_categories(
+        cls,
+        session: AsyncSession,
+        user_id: uuid.UUID,
+        income_categories: list[str],
+        expense_categories: list[str]
+    ) -> None:
+        """Insert both category rows of a user being registered on a shard.
+
+        The shard and the control database commit separately, so these are
+        committed before the user: an orphan category row is harmless, a user
+        without one is not.
+        """
+        mark_written(session)
+        for type_model, categories in (
+            (IncomeTypeModel, income_categories),
+            (ExpenseTypeModel, expense_categories)
+        ):
+            await session.execute(
+                insert(type_model).values(user_id=user_id, categories=categories)
+            )
+
 
 class RefreshSessionDAO(BaseDAO[RefreshSessionModel, RefreshSessionCreate, RefreshSessionUpdate]):
     model = RefreshSessionModel
@@ -4,9 +4,9 @@ import uuid
 
 from app.finance.models import ExpenseTypeModel, IncomeTypeModel
 from app.utils.database.database import Base, BaseUUID
-from app.finance.mixins import CurrencyRelationMixin, UserRelationMixin 
+from app.finance.mixins import ChangeTrackingMixin, CurrencyRelationMixin, UserRelationMixin
 
-from sqlalchemy import TIMESTAMP, String
+from sqlalchemy import TIMESTAMP, SmallInteger, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
@@ -14,11 +14,11 @@ if TYPE_CHECKING:
     from app.finance.models import ExpenseModel, IncomeModel
 
 
-class UserModel(BaseUUID):
+class UserModel(BaseUUID, ChangeTrackingMixin):
     __tablename__ = "user"
     user_rels = {"back_populates": __tablename__}
     
-    email: Mapped[str] = mapped_column(index=True)
+    email: Mapped[str] = mapped_column(index=True, unique=True)
     hashed_password: Mapped[str]
 
     profiles: Mapped["ProfileModel"] = relationship(**user_rels)
@@ -39,12 +39,14 @@ class UserModel(BaseUUID):
     is_active: Mapped[bool] = mapped_column(default=True)
     is_verified: Mapped[bool] = mapped_column(default=False)
     is_superuser: Mapped[bool] = mapped_column(default=False)
+    # set at registration when sharding is enabled, see ShardRouter
+    shard: Mapped[int | None] = mapped_column(SmallInteger, index=True)
 
     def __str__(self):
         return 'User: ' + self.email
 
 
-class ProfileModel(Base, UserRelationMixin, CurrencyRelationMixin):
+class ProfileModel(Base, ChangeTrackingMixin, UserRelationMixin, CurrencyRelationMixin):
     __tablename__ = "profiles"
     _user_back_populates = __tablename__
     _currenecy_back_populates = __tablename__
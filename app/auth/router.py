@@ -1,13 +1,11 @@
 import uuid
 
-from app.finance.service import FinanceService
 from .dependencies import (
     get_current_active_user,
     get_current_superuser,
     get_current_verified_user,
     get_not_verified_user
 )
-from .models import UserModel
 from .service import (
     AuthService,
     UserService
@@ -26,6 +24,7 @@ from app.utils.exceptions import (
     UserAlreadyExistsException
 )
 from app.data.config import settings
+from app.utils.rate_limit import RateLimiter
 
 from fastapi import (
     APIRouter,
@@ -50,13 +49,18 @@ user_router = APIRouter(
     #  Auth Router  #
     #################
  
-@auth_router.post("/register", status_code=status.HTTP_201_CREATED)
+@auth_router.post(
+    "/register",
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(RateLimiter("register", capacity=5, period=60))]
+)
 async def register(user: UserCreate) -> User:
-    db_user = await UserService.register_new_user(user)
-    await FinanceService.adding_base_categories(db_user.id)
-    return db_user
+    return await UserService.register_new_user(user)
 
-@auth_router.post("/login")
+@auth_router.post(
+    "/login",
+    dependencies=[Depends(RateLimiter("login", capacity=10, period=60))]
+)
 async def login(
     response: Response,
     credentials: OAuth2PasswordRequestForm = Depends()
@@ -79,9 +83,12 @@ async def login(
     )
     return token
 
-@auth_router.get("/request_for_verify")
+@auth_router.get(
+    "/request_for_verify",
+    dependencies=[Depends(RateLimiter("request_for_verify", capacity=3, period=300, by="user"))]
+)
 async def request_for_verify(
-    user: UserModel = Depends(get_not_verified_user),
+    user: User = Depends(get_not_verified_user),
 ) -> bool:
     return await AuthService.send_verification_token(user)
 
@@ -97,7 +104,7 @@ async def verify(
 async def logout(
     request: Request,
     response: Response,
-    user: UserModel = Depends(get_current_active_user),
+    user: User = Depends(get_current_active_user),
 ):
     response.delete_cookie('access_token')
     response.delete_cookie('refresh_token')
@@ -106,7 +113,10 @@ async def logout(
     return {"message": "Logged out successfully"}
 
 
-@auth_router.post("/refresh")
+@auth_router.post(
+    "/refresh",
+    dependencies=[Depends(RateLimiter("refresh", capacity=30, period=60))]
+)
 async def refresh_token(
     request: Request,
     response: Response
@@ -132,7 +142,7 @@ async def refresh_token(
 @auth_router.post("/abort")
 async def abort_all_sessions(
     response: Response,
-    user: UserModel = Depends(get_current_verified_user)
+    user: User = Depends(get_current_verified_user)
 ):
     response.delete_cookie('access_token')
     response.delete_cookie('refresh_token')
@@ -150,14 +160,14 @@ async def abort_all_sessions(
 async def get_users_list(
     offset: int | None = 0,
     limit: int | None = 100,
-    current_user: UserModel = Depends(get_current_superuser)
+    current_user: User = Depends(get_current_superuser)
 ) -> list[User]:
     return await UserService.get_users_list(offset=offset, limit=limit)
 
 
 @user_router.get("/me")
 async def get_current_verified_user(
-    current_user: UserModel = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user)
 ) -> User:
     return await UserService.get_user(current_user.id)
 
@@ -165,7 +175,7 @@ async def get_current_verified_user(
 @user_router.patch("/me")
 async def update_current_user(
     new_password: str,
-    current_user: UserModel = Depends(get_current_verified_user)
+    current_user: User = Depends(get_current_verified_user)
 ) -> User:
     return await UserService.update_user(current_user.id, password=new_password)
 
@@ -174,7 +184,7 @@ async def update_current_user(
 async def delete_current_user(
     request: Request,
     response: Response,
-    current_user: UserModel = Depends(get_not_verified_user)
+    current_user: User = Depends(get_not_verified_user)
 ):
     response.delete_cookie('access_token')
     response.delete_cookie('refresh_token')
@@ -187,7 +197,7 @@ async def delete_current_user(
 @user_router.get("/{user_id}")
 async def get_user(
     user_id: str,
-    current_user: UserModel = Depends(get_current_superuser)
+    current_user: User = Depends(get_current_superuser)
 ) -> User:
     return await UserService.get_user(user_id)
 
@@ -196,7 +206,7 @@ async def get_user(
 async def update_user(
     user_id: str,
     user: User,
-    current_user: UserModel = Depends(get_current_superuser)
+    current_user: User = Depends(get_current_superuser)
 ) -> User:
     return await UserService.update_user_from_superuser(user_id, user)
 
@@ -204,7 +214,7 @@ async def update_user(
 @user_router.delete("/{user_id}")
 async def delete_user(
     user_id: str,
-    current_user: UserModel = Depends(get_current_superuser)
+    current_user: User = Depends(get_current_superuser)
 ):
     await UserService.delete_user_from_superuser(user_id)
     return {"message": "User was deleted"}
@@ -217,20 +227,20 @@ async def delete_user(
 @user_router.post("/me/profile", status_code=status.HTTP_201_CREATED)
 async def create_profile(
     profile: BaseProfile,
-    current_user: UserModel = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user)
 ) -> Profile:
     return await UserService.create_profile(profile, current_user.id)
 
 @user_router.put("/me/profile")
 async def update_profile(
     profile: BaseProfile,
-    current_user: UserModel = Depends(get_current_verified_user)
+    current_user: User = Depends(get_current_verified_user)
 ) -> Profile:
     return await UserService.update_profile(profile, current_user.id)
 
 @user_router.delete("/me/profile")
 async def delete_profile(
-    current_user: UserModel = Depends(get_current_verified_user)
+    current_user: User = Depends(get_current_verified_user)
 ):
     return await UserService.delete_profile(current_user.id)
      
\ No newline at end of file
@@ -1,3 +1,4 @@
+import asyncio
 import uuid
 from datetime import datetime, timedelta, timezone
 import smtplib
@@ -22,8 +23,21 @@ from .schemas import (
 from .utils import get_password_hash, is_valid_password
 from .models import ProfileModel, UserModel, RefreshSessionModel
 from .dao import ProfileDAO, UserDAO, RefreshSessionDAO
+from app.archive.dao import ArchivedExpenseDAO, ArchivedIncomeDAO
+from app.balances.dao import DailyBalanceDAO
+from app.finance.dao import ExpenseDAO, ExpenseTypeDAO, IncomeDAO, IncomeTypeDAO
+from app.statements.dao import StatementDAO
 from app.utils.exceptions import InvalidTokenException, TokenExpiredException
-from app.utils.database.database import async_session_maker
+from app.finance.service import FinanceService
+from app.outbox.service import OutboxService
+from app.utils.database.database import (
+    all_shards, async_session_maker, placed_session, shard_router, shard_session, user_session
+)
+from app.utils.cache import cached, service_cache
+from app.utils.database.replicas import pin_to_primary
+from app.utils.database.shards import ShardNotSelectedError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.utils.responses import orm_to_dict
 from app.data.config import settings
 
 from fastapi import HTTPException, status
@@ -37,7 +51,7 @@ class AuthService:
         access_token = AuthService._create_jwt_token(user_id=user_id)
         refresh_token_expires = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
         refresh_token = AuthService._create_refresh_token()
-        async with async_session_maker() as session:
+        async with user_session(user_id) as session:
             await RefreshSessionDAO.add(
                 session,
                 RefreshSessionCreate(
@@ -56,9 +70,7 @@ class AuthService:
     @staticmethod
     async def logout(token: uuid.UUID) -> None:
         async with async_session_maker() as session:
-            refresh_session = await RefreshSessionDAO.find_one_or_none(
-                session, RefreshSessionModel.refresh_token == token
-            )
+            refresh_session = await AuthService._find_refresh_session(session, token)
             if refresh_session:
                 await RefreshSessionDAO.delete(session, id=refresh_session.id)
             await session.commit()
@@ -66,9 +78,8 @@ class AuthService:
     @staticmethod
     async def refresh_token(token: uuid.UUID) -> Token:
         async with async_session_maker() as session:
-            refresh_session = await RefreshSessionDAO.find_one_or_none(
-                session, RefreshSessionModel.refresh_token == token
-            )
+            pin_to_primary(session)
+            refresh_session = await AuthService._find_refresh_session(session, token)
             if not refresh_session:
                 raise InvalidTokenException
             if datetime.now(timezone.utc) >= refresh_session.created_at + timedelta(
@@ -77,7 +88,7 @@ class AuthService:
                 await RefreshSessionDAO.delete(id=refresh_session.id)
                 raise TokenExpiredException
 
-            user = await UserDAO.find_one_or_none(session, id=refresh_session.user_id)
+            user = await UserDAO.find_one_by(session, "id", refresh_session.user_id)
             if not user:
                 raise InvalidTokenException
 
@@ -98,17 +109,39 @@ class AuthService:
             access_token=access_token, refresh_token=refresh_token, token_type="bearer"
         )
 
+    @staticmethod
+    async def _find_refresh_session(
+        session: AsyncSession, token: uuid.UUID
+    ) -> RefreshSessionModel | None:
+        if not shard_router.enabled:
+            return await RefreshSessionDAO.find_one_by(session, "refresh_token", token)
+
+        # the token alone does not say whose it is, so every shard is asked
+        # and `session` is routed to the one that has it
+        async def lookup(shard: int) -> RefreshSessionModel | None:
+            async with shard_session(shard) as shard_lookup:
+                return await RefreshSessionDAO.find_one_by(
+                    shard_lookup, "refresh_token", token
+                )
+
+        found = await asyncio.gather(*map(lookup, all_shards()))
+        for shard, refresh_session in enumerate(found):
+            if refresh_session is not None:
+                session.info["shard"] = shard
+                return refresh_session
+        return None
+
     @staticmethod
     async def authenticate_user(email: str, password: str) -> UserModel | None:
         async with async_session_maker() as session:
-            db_user = await UserDAO.find_one_or_none(session, email=email)
+            db_user = await UserDAO.find_one_by(session, "email", email)
         if db_user and is_valid_password(password, db_user.hashed_password):
             return db_user
         return None
 
     @staticmethod
     async def abort_all_sessions(user_id: uuid.UUID):
-        async with async_session_maker() as session:
+        async with user_session(user_id) as session:
             await RefreshSessionDAO.delete(
                 session, RefreshSessionModel.user_id == user_id
             )
@@ -170,7 +203,7 @@ class AuthService:
             server.send_message(msg)
     
     @staticmethod
-    async def send_verification_token(user: UserModel):
+    async def send_verification_token(user: User):
         if user.is_verified:
             raise HTTPException(
                     status_code=status.HTTP_409_CONFLICT, 
@@ -195,7 +228,7 @@ class AuthService:
                     raise InvalidTokenException
             except Exception:
                 raise InvalidTokenException
-            db_user = await UserDAO.find_one_or_none(session, email=email)
+            db_user = await UserDAO.find_one_by(session, "email", email)
             if db_user.is_verified:
                 return {
                     "status": "error",
@@ -207,7 +240,11 @@ class AuthService:
                 UserModel.email == email, 
                 obj_in={"is_verified": True}
             )
+            await OutboxService.emit(
+                session, OutboxService.USERS_STREAM, "user.verified", {"user_id": db_user.id}
+            )
             await session.commit()
+            await service_cache.invalidate_tags(f"user:{db_user.id}")
             return {
                 "status": "success",
                 "data": None,
@@ -218,28 +255,52 @@ class AuthService:
 class UserService:
     @staticmethod
     async def register_new_user(user: UserCreate) -> UserModel:
-        async with async_session_maker() as session:
-            user_exist = await UserDAO.find_one_or_none(session, email=user.email)
-            if user_exist:
-                raise HTTPException(
-                    status_code=status.HTTP_409_CONFLICT, 
-                    detail="User already exists"
+        user_id = uuid.uuid4()
+        shard = shard_router.place(user_id)
+        if shard_router.enabled:
+            async with placed_session(shard) as session:
+                await UserDAO.add_categories(
+                    session,
+                    user_id,
+                    income_categories=FinanceService.BASE_INCOMES,
+                    expense_categories=FinanceService.BASE_EXPENCIES
                 )
-
-            db_user = await UserDAO.add(
+                await session.commit()
+        async with placed_session(shard) as session:
+            db_user = await UserDAO.add_with_categories(
                 session,
+                user_id,
                 UserCreateDB(
                     **user.model_dump(),
                     hashed_password=get_password_hash(user.password),
                 ),
+                income_categories=FinanceService.BASE_INCOMES,
+                expense_categories=FinanceService.BASE_EXPENCIES,
+                shard=shard
+            )
+            if not db_user:
+                if shard_router.enabled:
+                    for dao in (IncomeTypeDAO, ExpenseTypeDAO):
+                        await dao.delete(session, user_id=user_id)
+                    await session.commit()
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT, 
+                    detail="User already exists"
+                )
+            await OutboxService.emit(
+                session,
+                OutboxService.USERS_STREAM,
+                "user.registered",
+                orm_to_dict(User, db_user)
             )
             await session.commit()
         return db_user
 
     @staticmethod
-    async def get_user(user_id: uuid.UUID) -> UserModel:
+    @cached(User, ttl=60, tags=lambda user_id: [f"user:{user_id}"])
+    async def get_user(user_id: uuid.UUID) -> User:
         async with async_session_maker() as session:
-            db_user = await UserDAO.find_one_or_none(session, id=user_id)
+            db_user = await UserDAO.find_one_by(session, "id", user_id)
         if not db_user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
@@ -280,19 +341,27 @@ class UserService:
             user_update = await UserDAO.update(
                 session, UserModel.id == user_id, obj_in=user_in
             )
+            await OutboxService.emit(
+                session, OutboxService.USERS_STREAM, "user.updated", {"user_id": user_id}
+            )
             await session.commit()
+            await service_cache.invalidate_tags(f"user:{user_id}")
             return user_update
 
     @staticmethod
     async def delete_user(user_id: uuid.UUID):
         async with async_session_maker() as session:
-            db_user = await UserDAO.find_one_or_none(session, id=user_id)
+            db_user = await UserDAO.find_one_by(session, "id", user_id)
             if not db_user:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
                 )
             await UserDAO.update(session, UserModel.id == user_id, obj_in={"is_active": False})
+            await OutboxService.emit(
+                session, OutboxService.USERS_STREAM, "user.deactivated", {"user_id": user_id}
+            )
             await session.commit()
+        await service_cache.invalidate_tags(f"user:{user_id}")
 
     @staticmethod
     async def get_users_list(
@@ -332,21 +401,47 @@ class UserService:
             user_update = await UserDAO.update(
                 session, UserModel.id == user_id, obj_in=user_in
             )
+            await OutboxService.emit(
+                session,
+                OutboxService.USERS_STREAM,
+                "user.updated",
+                {"user_id": user_id, **user.model_dump(exclude_unset=True, exclude={"password"})}
+            )
             await session.commit()
+            await service_cache.invalidate_tags(f"user:{user_id}")
             return user_update
 
     @staticmethod
     async def delete_user_from_superuser(user_id: uuid.UUID):
-        async with async_session_maker() as session:
+        try:
+            shard = await shard_router.shard_for(user_id)
+        except ShardNotSelectedError:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+            )
+        async with placed_session(shard) as session:
             await UserDAO.delete(session, UserModel.id == user_id)
+            if shard_router.enabled:
+                # foreign keys do not reach across databases, so the user's
+                # shard rows are not cascaded and have to go explicitly
+                for dao in (
+                    IncomeDAO, ExpenseDAO, IncomeTypeDAO, ExpenseTypeDAO, ProfileDAO,
+                    RefreshSessionDAO, StatementDAO, ArchivedIncomeDAO, ArchivedExpenseDAO,
+                    DailyBalanceDAO
+                ):
+                    await dao.delete(session, user_id=user_id)
+            await OutboxService.emit(
+                session, OutboxService.USERS_STREAM, "user.deleted", {"user_id": user_id}
+            )
             await session.commit()
+        await service_cache.invalidate_tags(f"user:{user_id}")
 
     @staticmethod
     async def create_profile( 
         profile: BaseProfile, 
         user_id: uuid.UUID
     ) -> ProfileModel:
-        async with async_session_maker() as session:
+        async with user_session(user_id) as session:
             profile_exist = await ProfileDAO.find_one_or_none(session, user_id=user_id)
             if profile_exist:
                 raise HTTPException(
@@ -360,6 +455,12 @@ class UserService:
                     user_id=user_id
                 )
             )
+            await OutboxService.emit(
+                session,
+                OutboxService.USERS_STREAM,
+                "profile.created",
+                {**profile.model_dump(), "user_id": user_id}
+            )
             await session.commit()
             return new_profile
         
@@ -368,7 +469,7 @@ class UserService:
         new_profile: BaseProfile,
         user_id: uuid.UUID
     ) -> ProfileModel:
-        async with async_session_maker() as session:
+        async with user_session(user_id) as session:
             db_profile = await ProfileDAO.find_one_or_none(
                 session, 
                 user_id == user_id
@@ -383,12 +484,18 @@ class UserService:
                 user_id == user_id, 
                 obj_in=new_profile
             )
+            await OutboxService.emit(
+                session,
+                OutboxService.USERS_STREAM,
+                "profile.updated",
+                {**new_profile.model_dump(), "user_id": user_id}
+            )
             await session.commit()
             return profile_update
         
     @staticmethod
     async def delete_profile(user_id: uuid.UUID) -> ProfileModel:
-        async with async_session_maker() as session:
+        async with user_session(user_id) as session:
             db_profile = await ProfileDAO.find_one_or_none(
                 session, 
                 ProfileModel.user_id == user_id
@@ -402,5 +509,8 @@ class UserService:
                 session,
                 user_id=user_id
             )
+            await OutboxService.emit(
+                session, OutboxService.USERS_STREAM, "profile.deleted", {"user_id": user_id}
+            )
             await session.commit()
         return {"message": "Profile has been deleted"}
\ No newline at end of file
@@ -4,6 +4,8 @@ from fastapi.openapi.models import OAuthFlows as OAuthFlowsModel
 from fastapi.security import OAuth2
 from fastapi.security.utils import get_authorization_scheme_param
 
+from app.utils.timing import phase
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 class OAuth2PasswordBearerWithCookie(OAuth2):
@@ -37,8 +39,10 @@ class OAuth2PasswordBearerWithCookie(OAuth2):
 
 
 def is_valid_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    with phase("bcrypt"):
+        return pwd_context.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    with phase("bcrypt"):
+        return pwd_context.hash(password)
@@ -0,0 +1,204 @@
+from datetime import date
+from decimal import Decimal
+from typing import Iterable
+import uuid
+
+from sqlalchemy import (
+    Date, Numeric, Row, String, Uuid, and_, cast, column, delete, exists, func, select, text,
+    union_all, values
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.archive.dao import ArchivedExpenseDAO, ArchivedIncomeDAO
+from app.dao.base import BaseDAO
+from app.utils.database.replicas import mark_written
+from .models import DailyBalanceModel
+
+BalanceKey = tuple[uuid.UUID, str, date]
+
+# first half of the (int, int) pg advisory lock guarding a user's snapshots;
+# the second half is derived from the user id
+BALANCE_LOCK_SPACE = 0x62616C
+LOCK_USERS = text(
+    "SELECT pg_advisory_xact_lock(:space, key) FROM unnest(CAST(:keys AS integer[])) AS key"
+)
+
+
+def utc_day(created_at):
+    return cast(func.timezone("UTC", created_at), Date)
+
+
+class DailyBalanceDAO(BaseDAO):
+    model = DailyBalanceModel
+
+    @classmethod
+    async def lock_users(cls, session: AsyncSession, user_ids: Iterable[uuid.UUID]) -> None:
+        """Serialize writes to the users' snapshots until the transaction ends.
+
+        Keys are taken in ascending order, so two writers covering several of
+        the same users queue up instead of deadlocking.
+        """
+        keys = sorted({
+            int.from_bytes(user_id.bytes[:4], "big", signed=True) for user_id in user_ids
+        })
+        if not keys:
+            return
+        mark_written(session)
+        await session.execute(
+            LOCK_USERS,
+            {"space": BALANCE_LOCK_SPACE, "keys": keys},
+            bind_arguments={"mapper": cls.model.__mapper__}
+        )
+
+    @classmethod
+    async def apply(cls, session: AsyncSession, deltas: dict[BalanceKey, Decimal]) -> None:
+        """Shift the balance of every snapshot on or after each delta's day.
+
+        A delta landing on a day without a row first gets one carrying the
+        previous closing balance, so the day's own balance can be shifted too.
+        """
+        if not deltas:
+            return
+        # the previous balance read below and the shift of every later row both
+        # rely on nobody else changing the user's snapshots meanwhile
+        await cls.lock_users(session, (user_id for user_id, _, _ in deltas))
+        b = cls.model.__table__
+        changes = values(
+            column("user_id", Uuid),
+            column("currency_code", String),
+            column("day", Date),
+            column("amount", Numeric),
+            name="changes"
+        ).data([(*key, amount) for key, amount in deltas.items()])
+        previous = (
+            select(b.c.balance)
+            .where(
+                b.c.user_id == changes.c.user_id,
+                b.c.currency_code == changes.c.currency_code,
+                b.c.day < changes.c.day
+            )
+            .order_by(b.c.day.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+        mark_written(session)
+        await session.execute(
+            pg_insert(cls.model)
+            .from_select(
+                ["user_id", "currency_code", "day", "balance"],
+                select(
+                    changes.c.user_id,
+                    changes.c.currency_code,
+                    changes.c.day,
+                    func.coalesce(previous, 0)
+                )
+            )
+            .on_conflict_do_nothing()
+        )
+        shifts = (
+            select(
+                b.c.user_id, b.c.currency_code, b.c.day,
+                func.sum(changes.c.amount).label("amount")
+            )
+            .join(changes, and_(
+                b.c.user_id == changes.c.user_id,
+                b.c.currency_code == changes.c.currency_code,
+                b.c.day >= changes.c.day
+            ))
+            .group_by(b.c.user_id, b.c.currency_code, b.c.day)
+            .subquery("shifts")
+        )
+        await session.execute(
+            b.update()
+            .where(
+                b.c.user_id == shifts.c.user_id,
+                b.c.currency_code == shifts.c.currency_code,
+                b.c.day == shifts.c.day
+            )
+            .values(balance=b.c.balance + shifts.c.amount)
+        )
+
+    @classmethod
+    async def series(
+        cls,
+        session: AsyncSession,
+        user_id: uuid.UUID,
+        currency_code: str,
+        start: date,
+        end: date
+    ) -> list[Row]:
+        """Snapshots within [start, end] plus the last one before `start`."""
+        b = cls.model
+        opening = (
+            select(func.max(b.day))
+            .where(b.user_id == user_id, b.currency_code == currency_code, b.day <= start)
+            .scalar_subquery()
+        )
+        stmt = (
+            select(b.day, b.balance)
+            .where(
+                b.user_id == user_id,
+                b.currency_code == currency_code,
+                b.day >= func.coalesce(opening, start),
+                b.day <= end
+            )
+            .order_by(b.day)
+        )
+        result = await session.execute(stmt, bind_arguments=await cls._read_bind(session))
+        return result.all()
+
+    @classmethod
+    async def reconcile(cls, session: AsyncSession, user_ids: list[uuid.UUID]) -> int:
+        """Recompute the users' snapshots from every item, archived ones included.
+
+        Holds the users' locks from before the items are read, so a delta from a
+        concurrent write lands either in the items read here or on top of the
+        rewritten snapshots. Returns how many rows were wrong (rewritten or removed).
+        """
+        await cls.lock_users(session, user_ids)
+        movements = union_all(*[
+            select(
+                source.c.user_id,
+                source.c.currency_code,
+                utc_day(source.c.created_at).label("day"),
+                (source.c.value * sign).label("amount")
+            ).where(source.c.user_id.in_(user_ids))
+            for source, sign in (
+                (ArchivedIncomeDAO.with_hot(), 1),
+                (ArchivedExpenseDAO.with_hot(), -1)
+            )
+        ]).subquery("movements")
+        m = movements.c
+        flows = (
+            select(m.user_id, m.currency_code, m.day, func.sum(m.amount).label("net"))
+            .group_by(m.user_id, m.currency_code, m.day)
+            .cte("flows")
+        )
+        f = flows.c
+        expected = select(
+            f.user_id,
+            f.currency_code,
+            f.day,
+            func.sum(f.net).over(partition_by=(f.user_id, f.currency_code), order_by=f.day)
+        )
+        upsert = pg_insert(cls.model).from_select(
+            ["user_id", "currency_code", "day", "balance"], expected
+        )
+        upsert = upsert.on_conflict_do_update(
+            index_elements=["user_id", "currency_code", "day"],
+            set_={"balance": upsert.excluded.balance},
+            where=cls.model.balance.is_distinct_from(upsert.excluded.balance)
+        )
+        # days left without any item, e.g. after their last one was deleted
+        orphans = delete(cls.model).where(
+            cls.model.user_id.in_(user_ids),
+            ~exists().where(
+                f.user_id == cls.model.user_id,
+                f.currency_code == cls.model.currency_code,
+                f.day == cls.model.day
+            )
+        ).add_cte(flows)
+        removed = await session.execute(orphans)
+        written = await session.execute(upsert)
+        return removed.rowcount + written.rowcount
@@ -0,0 +1,23 @@
+from datetime import date
+from decimal import Decimal
+import uuid
+
+from app.utils.database.database import Base
+
+from sqlalchemy import ForeignKey, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class DailyBalanceModel(Base):
+    """Closing balance of a user's currency at the end of a UTC day with activity.
+
+    Days without a row carry the balance of the closest earlier row.
+    """
+    __tablename__ = "daily_balances"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey('user.id', ondelete="CASCADE"), primary_key=True
+    )
+    currency_code: Mapped[str] = mapped_column(String(3), primary_key=True)
+    day: Mapped[date] = mapped_column(primary_key=True)
+    balance: Mapped[Decimal]
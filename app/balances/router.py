@@ -0,0 +1,25 @@
+from datetime import date
+
+from fastapi import APIRouter, Depends, Query
+
+from app.auth.dependencies import get_current_verified_user
+from app.auth.schemas import User
+from app.balances.schemas import BalanceSeries
+from app.balances.service import BalanceService
+
+
+balance_router = APIRouter(
+    prefix="/balances",
+    tags=["balances"]
+)
+
+
+@balance_router.get("")
+async def get_balance_series(
+    currency_code: str = Query(max_length=3, examples=['USD']),
+    start: date | None = None,
+    end: date | None = None,
+    current_user: User = Depends(get_current_verified_user)
+) -> BalanceSeries:
+    """End-of-day balances for every day in [start, end], 30 days up to today by default."""
+    return await BalanceService.get_series(current_user.id, currency_code, start, end)
@@ -0,0 +1,14 @@
+from datetime import date
+from decimal import Decimal
+
+from pydantic import BaseModel, Field
+
+
+class BalancePoint(BaseModel):
+    day: date
+    balance: Decimal
+
+
+class BalanceSeries(BaseModel):
+    currency_code: str = Field(examples=['USD'])
+    points: list[BalancePoint]
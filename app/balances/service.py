@@ -0,0 +1,98 @@
+import asyncio
+import logging
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Iterable
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.data.config import settings
+from app.finance.models import IncomeTypeModel
+from app.tasks.celery import celery_app
+from app.utils.database.database import user_session
+from app.utils.exceptions import InvalidBalanceRangeException
+from .dao import BalanceKey, DailyBalanceDAO
+
+logger = logging.getLogger(__name__)
+
+# (user_id, currency_code, created_at, signed amount)
+Movement = tuple[uuid.UUID, str, datetime, Decimal]
+
+
+class BalanceService:
+    @staticmethod
+    async def record(session: AsyncSession, movements: Iterable[Movement]) -> None:
+        """Fold finance item changes into the snapshots, in the caller's transaction."""
+        deltas: dict[BalanceKey, Decimal] = defaultdict(Decimal)
+        for user_id, currency_code, created_at, amount in movements:
+            deltas[(user_id, currency_code, created_at.astimezone(timezone.utc).date())] += amount
+        await DailyBalanceDAO.apply(
+            session, {key: amount for key, amount in deltas.items() if amount}
+        )
+
+    @staticmethod
+    async def get_series(
+        user_id: uuid.UUID,
+        currency_code: str,
+        start: date | None = None,
+        end: date | None = None
+    ) -> dict:
+        end = end or datetime.now(timezone.utc).date()
+        start = start or end - timedelta(days=30)
+        if start > end or (end - start).days >= settings.BALANCE_SERIES_MAX_DAYS:
+            raise InvalidBalanceRangeException
+        async with user_session(user_id) as session:
+            snapshots = await DailyBalanceDAO.series(
+                session, user_id, currency_code, start, end
+            )
+
+        points = []
+        balance = Decimal(0)
+        snapshots = iter(snapshots)
+        snapshot = next(snapshots, None)
+        for offset in range((end - start).days + 1):
+            day = start + timedelta(days=offset)
+            while snapshot is not None and snapshot.day <= day:
+                balance = snapshot.balance
+                snapshot = next(snapshots, None)
+            points.append({"day": day, "balance": balance})
+        return {"currency_code": currency_code, "points": points}
+
+    @staticmethod
+    async def reconcile() -> int:
+        fixed = 0
+        # celery runs each task in a fresh event loop, see StatementService.build
+        for url in settings.DATABASE_SHARD_URLS or [settings.DATABASE_URL]:
+            engine = create_async_engine(url, poolclass=NullPool)
+            session_maker = async_sessionmaker(engine, expire_on_commit=False)
+            try:
+                after = None
+                while True:
+                    # every user has exactly one income_types row, on their shard
+                    async with session_maker() as session:
+                        stmt = (
+                            select(IncomeTypeModel.user_id)
+                            .order_by(IncomeTypeModel.user_id)
+                            .limit(settings.BALANCE_RECONCILE_BATCH_USERS)
+                        )
+                        if after is not None:
+                            stmt = stmt.where(IncomeTypeModel.user_id > after)
+                        user_ids = (await session.scalars(stmt)).all()
+                        if not user_ids:
+                            break
+                        fixed += await DailyBalanceDAO.reconcile(session, user_ids)
+                        await session.commit()
+                    after = user_ids[-1]
+            finally:
+                await engine.dispose()
+        logger.info("reconciled daily balances", extra={"fixed": fixed})
+        return fixed
+
+
+@celery_app.task
+def reconcile_balances():
+    return asyncio.run(BalanceService.reconcile())
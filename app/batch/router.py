@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends
+
+from app.auth.dependencies import get_current_active_user
+from app.auth.schemas import User
+from app.batch.schemas import BatchRequest, BatchResult
+from app.batch.service import BatchService
+from app.utils.rate_limit import RateLimiter
+
+
+batch_router = APIRouter(
+    prefix="/batch",
+    tags=["batch"]
+)
+
+
+@batch_router.post(
+    "",
+    dependencies=[Depends(RateLimiter("batch", capacity=30, period=60, by="user"))]
+)
+async def run_batch(
+    batch: BatchRequest,
+    current_user: User = Depends(get_current_active_user)
+) -> list[BatchResult]:
+    """Run several operations with one authentication, one result per operation in order.
+
+    Idempotency keys and per-route rate limits do not apply to the operations.
+    """
+    return await BatchService.run(current_user, batch.operations)
@@ -0,0 +1,37 @@
+from datetime import date
+from typing import Any, Literal
+
+from pydantic import BaseModel, Field
+
+from app.data.config import settings
+
+
+class BatchOperation(BaseModel):
+    method: Literal["GET", "POST"]
+    path: str = Field(examples=["/finance/income/category"])
+    query: dict[str, str] = {}
+    body: dict[str, Any] | None = None
+
+
+class BatchRequest(BaseModel):
+    operations: list[BatchOperation] = Field(
+        min_length=1, max_length=settings.BATCH_MAX_OPERATIONS
+    )
+
+
+class BatchResult(BaseModel):
+    status: int = Field(examples=[200])
+    body: Any = None
+
+
+class CurrencyQuery(BaseModel):
+    currency_code: str = Field(max_length=3)
+
+
+class BalanceQuery(CurrencyQuery):
+    start: date | None = None
+    end: date | None = None
+
+
+class NewCategoryQuery(BaseModel):
+    new_category: str
@@ -0,0 +1,254 @@
+import asyncio
+import uuid
+from typing import Any, Awaitable, Callable, NamedTuple
+
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.dependencies import get_current_verified_user
+from app.auth.schemas import User
+from app.balances.schemas import BalanceSeries
+from app.balances.service import BalanceService
+from app.batch.schemas import (
+    BalanceQuery, BatchOperation, BatchResult, CurrencyQuery, NewCategoryQuery
+)
+from app.data.config import settings
+from app.finance.schemas import Currency, FinanceItem, FinanceItemCreate, SpendingAnalytics
+from app.finance.service import FinanceService
+from app.logger import logger
+from app.utils.cache import service_cache
+from app.utils.database.database import user_session
+from app.utils.database.replicas import read_from_primary
+from app.utils.exceptions import FinanceItemNotCreatedException
+
+
+class BatchRoute(NamedTuple):
+    # handler(user, query, body, session); session is only passed to writes
+    handler: Callable[..., Awaitable[Any]]
+    response: TypeAdapter
+    query: type[BaseModel] | None = None
+    body: type[BaseModel] | None = None
+    write: bool = False
+    verified: bool = True
+    tags: Callable[[uuid.UUID], list[str]] | None = None
+
+
+async def _me(user: User, query, body, session) -> User:
+    # already loaded by authentication, no need to read it again
+    return user
+
+
+async def _currencies(user: User, query, body, session):
+    return await FinanceService.get_all_currencies()
+
+
+def _categories(finance_type: str):
+    async def handler(user: User, query, body, session):
+        return await FinanceService.get_categories_list(finance_type, user.id)
+    return handler
+
+
+async def _analytics(user: User, query: CurrencyQuery, body, session):
+    return await FinanceService.get_spending_analytics(user.id, query.currency_code)
+
+
+async def _balances(user: User, query: BalanceQuery, body, session):
+    return await BalanceService.get_series(
+        user.id, query.currency_code, query.start, query.end
+    )
+
+
+def _add_category(finance_type: str):
+    async def handler(
+        user: User, query: NewCategoryQuery, body, session: AsyncSession
+    ):
+        return await FinanceService.append_category(
+            session, finance_type, user.id, query.new_category
+        )
+    return handler
+
+
+def _add_item(finance_type: str):
+    async def handler(
+        user: User, query, body: FinanceItemCreate, session: AsyncSession
+    ):
+        item = await FinanceService.insert_finance_item(session, finance_type, user.id, body)
+        if item is None:
+            raise FinanceItemNotCreatedException
+        return item
+    return handler
+
+
+def _category_tags(user_id: uuid.UUID) -> list[str]:
+    return [f"categories:{user_id}"]
+
+
+class BatchService:
+    ROUTES: dict[tuple[str, str], BatchRoute] = {
+        ("GET", "/users/me"): BatchRoute(_me, TypeAdapter(User), verified=False),
+        ("GET", "/finance"): BatchRoute(
+            _currencies, TypeAdapter(list[Currency]), verified=False
+        ),
+        ("GET", "/finance/income/category"): BatchRoute(
+            _categories(FinanceService.INCOME), TypeAdapter(list[str])
+        ),
+        ("GET", "/finance/expense/category"): BatchRoute(
+            _categories(FinanceService.EXPENSE), TypeAdapter(list[str])
+        ),
+        ("GET", "/finance/expense/analytics"): BatchRoute(
+            _analytics, TypeAdapter(SpendingAnalytics), query=CurrencyQuery
+        ),
+        ("GET", "/balances"): BatchRoute(
+            _balances, TypeAdapter(BalanceSeries), query=BalanceQuery
+        ),
+        ("POST", "/finance/income/category"): BatchRoute(
+            _add_category(FinanceService.INCOME), TypeAdapter(list[str]),
+            query=NewCategoryQuery, write=True, tags=_category_tags
+        ),
+        ("POST", "/finance/expense/category"): BatchRoute(
+            _add_category(FinanceService.EXPENSE), TypeAdapter(list[str]),
+            query=NewCategoryQuery, write=True, tags=_category_tags
+        ),
+        ("POST", "/finance/income"): BatchRoute(
+            _add_item(FinanceService.INCOME), TypeAdapter(FinanceItem),
+            body=FinanceItemCreate, write=True, verified=False
+        ),
+        ("POST", "/finance/expense"): BatchRoute(
+            _add_item(FinanceService.EXPENSE), TypeAdapter(FinanceItem),
+            body=FinanceItemCreate, write=True, verified=False
+        ),
+    }
+
+    @staticmethod
+    async def run(user: User, operations: list[BatchOperation]) -> list[BatchResult]:
+        """Run the operations for one authenticated user, results in request order.
+
+        Reads ahead of the first write run concurrently. Writes run in order in
+        one transaction, each under a savepoint so a failed one is rolled back
+        alone; reads placed after a write run concurrently once it is committed,
+        on the primary.
+        """
+        results: list[BatchResult | None] = [None] * len(operations)
+        routes: list[BatchRoute | None] = []
+        for i, operation in enumerate(operations):
+            route = BatchService.ROUTES.get((operation.method, operation.path.rstrip("/")))
+            if route is None:
+                results[i] = BatchService._unknown(operation)
+            routes.append(route)
+
+        writes = [i for i, route in enumerate(routes) if route is not None and route.write]
+        first_write = writes[0] if writes else len(operations)
+        reads = [i for i, route in enumerate(routes) if route is not None and not route.write]
+
+        await BatchService._run_reads(
+            user, operations, routes, results, [i for i in reads if i < first_write]
+        )
+        if not writes:
+            return results
+        await BatchService._run_writes(user, operations, routes, results, writes)
+        # a lagging replica may not have the writes yet
+        with read_from_primary():
+            await BatchService._run_reads(
+                user, operations, routes, results, [i for i in reads if i > first_write]
+            )
+        return results
+
+    @staticmethod
+    async def _run_reads(
+        user: User,
+        operations: list[BatchOperation],
+        routes: list[BatchRoute | None],
+        results: list[BatchResult | None],
+        indexes: list[int]
+    ) -> None:
+        # every read opens its own session (or hits the cache): one AsyncSession
+        # cannot run statements concurrently, so the pool bounds how many may run
+        slots = asyncio.Semaphore(settings.BATCH_READ_CONCURRENCY)
+
+        async def call(i: int) -> BatchResult:
+            async with slots:
+                return await BatchService._call(user, operations[i], routes[i])
+
+        done = await asyncio.gather(*[call(i) for i in indexes])
+        for i, result in zip(indexes, done):
+            results[i] = result
+
+    @staticmethod
+    async def _run_writes(
+        user: User,
+        operations: list[BatchOperation],
+        routes: list[BatchRoute | None],
+        results: list[BatchResult | None],
+        indexes: list[int]
+    ) -> None:
+        tags: set[str] = set()
+        async with user_session(user.id) as session:
+            for i in indexes:
+                route = routes[i]
+                results[i] = await BatchService._call(user, operations[i], route, session)
+                if results[i].status == status.HTTP_200_OK and route.tags:
+                    tags.update(route.tags(user.id))
+            try:
+                await session.commit()
+            except Exception:
+                logger.error("Batch writes could not be committed", exc_info=True)
+                for i in indexes:
+                    if results[i].status == status.HTTP_200_OK:
+                        results[i] = BatchService._internal_error()
+                return
+        if tags:
+            await service_cache.invalidate_tags(*tags)
+
+    @staticmethod
+    async def _call(
+        user: User,
+        operation: BatchOperation,
+        route: BatchRoute,
+        session: AsyncSession | None = None
+    ) -> BatchResult:
+        try:
+            if route.verified:
+                await get_current_verified_user(user)
+            query = route.query.model_validate(operation.query) if route.query else None
+            body = route.body.model_validate(operation.body) if route.body else None
+            if session is None:
+                value = await route.handler(user, query, body, None)
+            else:
+                async with session.begin_nested():
+                    value = await route.handler(user, query, body, session)
+            value = route.response.validate_python(value, from_attributes=True)
+            return BatchResult(
+                status=status.HTTP_200_OK, body=route.response.dump_python(value, mode="json")
+            )
+        except HTTPException as exc:
+            return BatchResult(status=exc.status_code, body={"detail": exc.detail})
+        except ValidationError as exc:
+            return BatchResult(
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                body={"detail": jsonable_encoder(exc.errors())}
+            )
+        except Exception:
+            logger.error(
+                "Batch operation failed",
+                extra={"method": operation.method, "path": operation.path},
+                exc_info=True
+            )
+            return BatchService._internal_error()
+
+    @staticmethod
+    def _unknown(operation: BatchOperation) -> BatchResult:
+        path = operation.path.rstrip("/")
+        if any(known == path for _, known in BatchService.ROUTES):
+            return BatchResult(
+                status=status.HTTP_405_METHOD_NOT_ALLOWED, body={"detail": "Method Not Allowed"}
+            )
+        return BatchResult(status=status.HTTP_404_NOT_FOUND, body={"detail": "Not Found"})
+
+    @staticmethod
+    def _internal_error() -> BatchResult:
+        return BatchResult(
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            body={"detail": "Internal Server Error"}
+        )
@@ -1,14 +1,19 @@
-from typing import Any, Generic, TypeVar
+from typing import Any, AsyncIterator, Generic, TypeVar
 from sqlalchemy.orm.strategy_options import _AbstractLoad
-from sqlalchemy import delete, insert, select, update
+from sqlalchemy import (
+    Row, Select, bindparam, column, delete, insert, select, tuple_, update, values
+)
 from sqlalchemy.orm import joinedload
 from sqlalchemy.sql import func
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from sqlalchemy.orm.attributes import InstrumentedAttribute
-from app.utils.database.database import async_session_maker, Base
-# from .logger import logger
+from app.utils.database.database import async_session_maker, Base, replica_router, shard_router
+from app.utils.database.replicas import mark_written
+from app.dao.estimates import approximate_count
+from app.data.config import settings
+from app.logger import logger
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
@@ -17,6 +22,19 @@ UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
 class BaseDAO(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     model = None
+    # prebuilt `column == :value` lookups, keyed by (model, column name); reusing
+    # the same statement object skips building it and recomputing its cache key
+    _lookup_statements: dict[tuple[type, str], Select] = {}
+
+    @classmethod
+    async def _read_bind(cls, session: AsyncSession) -> dict[str, Any] | None:
+        # replicas follow the control database, shard reads go through get_bind
+        if shard_router.is_sharded(cls.model.__table__.fullname):
+            return None
+        replica = await replica_router.engine_for_read(session)
+        if replica is None:
+            return None
+        return {"bind": replica.sync_engine}
 
     @classmethod
     async def find_one_or_none(
@@ -25,7 +43,22 @@ class BaseDAO(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         stmt = select(cls.model).filter(*filter).filter_by(**filter_by)
         # result = await session.execute(stmt)
         # return result.scalars().one_or_none()
-        return await session.scalar(stmt)
+        return await session.scalar(stmt, bind_arguments=await cls._read_bind(session))
+
+    @classmethod
+    async def find_one_by(
+        cls, session: AsyncSession, column: str, value: Any
+    ) -> ModelType | None:
+        key = (cls.model, column)
+        stmt = cls._lookup_statements.get(key)
+        if stmt is None:
+            stmt = select(cls.model).where(
+                getattr(cls.model, column) == bindparam("value")
+            )
+            cls._lookup_statements[key] = stmt
+        return await session.scalar(
+            stmt, {"value": value}, bind_arguments=await cls._read_bind(session)
+        )
 
     @classmethod
     async def find_all_with_joinedload_option(
@@ -45,7 +78,7 @@ class BaseDAO(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             .offset(offset)
             .limit(limit)
         )
-        result = await session.execute(stmt)
+        result = await session.execute(stmt, bind_arguments=await cls._read_bind(session))
         return result.mappings().all()
 
     @classmethod
@@ -64,9 +97,59 @@ class BaseDAO(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             .offset(offset)
             .limit(limit)
         )
-        result = await session.execute(stmt)
+        result = await session.execute(stmt, bind_arguments=await cls._read_bind(session))
         return result.scalars().all()
     
+    @classmethod
+    async def find_changed_since(
+        cls,
+        session: AsyncSession,
+        cursor: tuple[int, int],
+        watermark: int,
+        *filter,
+        limit: int = 500,
+        **filter_by
+    ) -> list[ModelType]:
+        """Rows after `cursor` in (change_xid, change_version) order.
+
+        `watermark` is the reading snapshot's xmin: every transaction below it
+        has finished, so rows under it can no longer appear behind the cursor,
+        while rows of newer transactions are held back until it passes them.
+        """
+        stmt = (
+            select(cls.model)
+            .filter(*filter)
+            .filter_by(**filter_by)
+            .filter(
+                tuple_(cls.model.change_xid, cls.model.change_version) > tuple_(*cursor),
+                cls.model.change_xid < watermark
+            )
+            .order_by(cls.model.change_xid, cls.model.change_version)
+            .limit(limit)
+        )
+        result = await session.execute(stmt, bind_arguments=await cls._read_bind(session))
+        return result.scalars().all()
+
+    @classmethod
+    async def stream_partitions(
+        cls,
+        session: AsyncSession,
+        columns: list[Any],
+        *filter,
+        chunk_size: int = 10_000,
+        **filter_by
+    ) -> AsyncIterator[list]:
+        stmt = (
+            select(*columns)
+            .select_from(cls.model)
+            .filter(*filter)
+            .filter_by(**filter_by)
+            .execution_options(yield_per=chunk_size)
+        )
+        result = await session.stream(stmt, bind_arguments=await cls._read_bind(session))
+        async for partition in result.partitions():
+            yield partition
+
     @classmethod
     async def add(
         cls, session: AsyncSession, obj_in: CreateSchemaType | dict[str, Any] | str
@@ -75,6 +158,7 @@ class BaseDAO(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             create_data = obj_in
         else:
             create_data = obj_in.model_dump(exclude_unset=True)
+        mark_written(session)
         try:
             stmt = insert(cls.model).values(**create_data).returning(cls.model)
             result = await session.execute(stmt)
@@ -82,17 +166,16 @@ class BaseDAO(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         except (SQLAlchemyError, Exception) as e:
             if isinstance(e, SQLAlchemyError):
                 msg = "Database Exc: Cannot insert data into table"
-                print(e)
             elif isinstance(e, Exception):
                 msg = "Unknown Exc: Cannot insert data into table"
 
-            # logger.error(msg, extra={"table": cls.model.__tablename__}, exc_info=True)
-            print(msg)
+            logger.error(msg, extra={"table": cls.model.__tablename__}, exc_info=True)
             return None
 
     @classmethod
     def add_all(cls, session: AsyncSession, data: list):
         objects = [cls.model(**d) for d in data]
+        mark_written(session)
         try:
             session.add_all(objects)
         except (SQLAlchemyError, Exception) as e:
@@ -101,13 +184,12 @@ class BaseDAO(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             elif isinstance(e, Exception):
                 msg = "Unknown Exc: Cannot insert data into table"
 
-            # logger.error(msg, extra={"table": cls.model.__tablename__}, exc_info=True)
-            print(msg)
-            print(e)
+            logger.error(msg, extra={"table": cls.model.__tablename__}, exc_info=True)
 
     @classmethod
     async def delete(cls, session: AsyncSession, *filter, **filter_by) -> None:
         stmt = delete(cls.model).filter(*filter).filter_by(**filter_by)
+        mark_written(session)
         await session.execute(stmt)
 
     @classmethod
@@ -123,6 +205,7 @@ class BaseDAO(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         else:
             update_data = obj_in.model_dump(exclude_unset=True)
 
+        mark_written(session)
         stmt = (
             update(cls.model)
             .where(*where)
@@ -134,8 +217,12 @@ class BaseDAO(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
 
     @classmethod
     async def add_bulk(cls, session: AsyncSession, data: list[dict[str, Any]]):
+        mark_written(session)
         try:
-            result = await session.execute(insert(cls.model).returning(cls.model), data)
+            result = await session.execute(
+                insert(cls.model).returning(cls.model, sort_by_parameter_order=True),
+                data
+            )
             return result.scalars().all()
         except (SQLAlchemyError, Exception) as e:
             if isinstance(e, SQLAlchemyError):
@@ -144,31 +231,95 @@ class BaseDAO(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
                 msg = "Unknown Exc"
             msg += ": Cannot bulk insert data into table"
 
-            # logger.error(msg, extra={"table": cls.model.__tablename__}, exc_info=True)
+            logger.error(msg, extra={"table": cls.model.__tablename__}, exc_info=True)
             return None
 
     @classmethod
-    async def update_bulk(cls, session: AsyncSession, data: list[dict[str, Any]]):
+    async def update_bulk(
+        cls, session: AsyncSession, data: list[dict[str, Any]], *where
+    ) -> list[ModelType]:
+        """Apply per-row changes keyed by primary key in one UPDATE ... FROM (VALUES ...).
+
+        Rows may change different columns; a column missing (or None) in a row
+        keeps its value. Only rows that matched the key and `where` are returned.
+        """
+        if not data:
+            return []
+        table = cls.model.__table__
+        pk = table.primary_key.columns[0]
+        names = [pk.name] + sorted(
+            {name for row in data for name, value in row.items() if value is not None}
+            - {pk.name}
+        )
+        changes = values(
+            *[column(name, table.c[name].type) for name in names], name="changes"
+        ).data([tuple(row.get(name) for name in names) for row in data])
+        stmt = (
+            update(cls.model)
+            .where(pk == changes.c[pk.name], *where)
+            .values({name: func.coalesce(changes.c[name], table.c[name]) for name in names[1:]})
+            .returning(cls.model)
+            .execution_options(synchronize_session=False)
+        )
+        mark_written(session)
         try:
-            stmt = update(cls.model)
-            await session.execute(update(cls.model), data)
-        except (SQLAlchemyError, Exception) as e:
-            if isinstance(e, SQLAlchemyError):
-                msg = "Database Exc"
-            elif isinstance(e, Exception):
-                msg = "Unknown Exc"
-            msg += ": Cannot bulk update data into table"
-            print(msg)
-            # logger.error(msg, extra={"table": cls.model.__tablename__}, exc_info=True)
-            return None
+            result = await session.execute(stmt)
+        except SQLAlchemyError:
+            logger.error(
+                "Database Exc: Cannot bulk update data in table",
+                extra={"table": cls.model.__tablename__},
+                exc_info=True
+            )
+            raise
+        return result.scalars().all()
 
     @classmethod
-    async def count(cls, session: AsyncSession, *filter, **filter_by):
+    async def lock_rows(
+        cls, session: AsyncSession, ids: list[Any], *where
+    ) -> list[Row]:
+        """Lock rows by primary key, in key order, until the transaction ends.
+
+        Returns plain rows rather than instances, so a later `update_bulk` in the
+        same session does not hand back the stale objects from the identity map.
+        """
+        if not ids:
+            return []
+        table = cls.model.__table__
+        pk = table.primary_key.columns[0]
+        stmt = select(table).where(pk.in_(ids), *where).order_by(pk).with_for_update()
+        mark_written(session)
+        result = await session.execute(stmt)
+        return result.all()
+
+    @classmethod
+    async def delete_bulk(
+        cls, session: AsyncSession, ids: list[Any], *where
+    ) -> list[Any]:
+        """Delete rows by primary key in one statement, returning the keys actually deleted."""
+        if not ids:
+            return []
+        pk = cls.model.__table__.primary_key.columns[0]
+        stmt = delete(cls.model).where(pk.in_(ids), *where).returning(pk)
+        mark_written(session)
+        result = await session.execute(stmt)
+        return result.scalars().all()
+
+    @classmethod
+    async def count(
+        cls, session: AsyncSession, *filter, approximate: bool = False, **filter_by
+    ):
+        if approximate:
+            stmt = None
+            if filter or filter_by:
+                stmt = select(cls.model).filter(*filter).filter_by(**filter_by)
+            return await approximate_count(
+                session, cls.model, stmt, threshold=settings.APPROXIMATE_COUNT_THRESHOLD
+            )
         stmt = (
             select(func.count())
             .select_from(cls.model)
             .filter(*filter)
             .filter_by(**filter_by)
         )
-        result = await session.execute(stmt)
+        result = await session.execute(stmt, bind_arguments=await cls._read_bind(session))
         return result.scalar()
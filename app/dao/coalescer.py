@@ -0,0 +1,106 @@
+import asyncio
+import uuid
+from typing import Any, Awaitable, Callable, Type
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.dao.base import BaseDAO
+from app.utils.database.database import placed_session, shard_router
+
+
+class WriteCoalescer:
+    """Collects concurrent inserts into one multi-row INSERT ... RETURNING.
+
+    A batch is flushed when `max_batch` rows are queued or `max_delay` seconds
+    have passed since the first one arrived, whichever comes first.
+    `on_flush` runs in the flushing transaction with the inserted rows.
+    With sharding enabled a batch is split into one INSERT per shard.
+    """
+
+    def __init__(
+        self,
+        dao: Type[BaseDAO],
+        max_batch: int = 50,
+        max_delay: float = 0.005,
+        on_flush: Callable[[AsyncSession, list], Awaitable[None]] | None = None
+    ) -> None:
+        self.dao = dao
+        self.on_flush = on_flush
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._pending: list[tuple[int | None, dict[str, Any], asyncio.Future]] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._flushes: set[asyncio.Task] = set()
+
+    async def add(self, data: dict[str, Any]):
+        shard = await shard_router.shard_for(data["user_id"])
+        loop = asyncio.get_running_loop()
+        row = {"id": uuid.uuid4(), **data}
+        future = loop.create_future()
+        self._pending.append((shard, row, future))
+
+        if len(self._pending) >= self.max_batch:
+            self._schedule_flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_delay, self._schedule_flush)
+        return await future
+
+    async def close(self) -> None:
+        if self._pending:
+            self._schedule_flush()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    def _schedule_flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        by_shard: dict[int | None, list] = {}
+        for shard, row, future in batch:
+            by_shard.setdefault(shard, []).append((row, future))
+        for shard, shard_batch in by_shard.items():
+            task = asyncio.create_task(self._flush(shard, shard_batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _flush(
+        self, shard: int | None, batch: list[tuple[dict[str, Any], asyncio.Future]]
+    ) -> None:
+        try:
+            async with placed_session(shard) as session:
+                db_rows = await self.dao.add_bulk(session, [row for row, _ in batch])
+                if db_rows is not None:
+                    if self.on_flush is not None:
+                        await self.on_flush(session, db_rows)
+                    await session.commit()
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        if db_rows is not None:
+            by_id = {db_row.id: db_row for db_row in db_rows}
+            for row, future in batch:
+                if not future.done():
+                    future.set_result(by_id.get(row["id"]))
+            return
+        # one bad row must not fail its neighbours: retry them one by one
+        for row, future in batch:
+            await self._insert_one(shard, row, future)
+
+    async def _insert_one(
+        self, shard: int | None, row: dict[str, Any], future: asyncio.Future
+    ) -> None:
+        try:
+            async with placed_session(shard) as session:
+                db_row = await self.dao.add(session, row)
+                if self.on_flush is not None and db_row is not None:
+                    await self.on_flush(session, [db_row])
+                await session.commit()
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+        if not future.done():
+            future.set_result(db_row)
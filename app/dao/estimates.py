@@ -0,0 +1,57 @@
+import json
+from typing import Any
+
+from sqlalchemy import Select, select, text
+from sqlalchemy.exc import CompileError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import func
+
+
+async def estimate_table_rows(session: AsyncSession, model: Any) -> int | None:
+    """Planner estimate of the table size from pg_class.reltuples.
+
+    None when the table has never been vacuumed or analyzed.
+    """
+    stmt = text(
+        "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"
+    )
+    estimate = await session.scalar(stmt, {"table": f'"{model.__tablename__}"'})
+    if estimate is None or estimate < 0:
+        return None
+    return estimate
+
+
+async def estimate_query_rows(session: AsyncSession, stmt: Select) -> int | None:
+    """Planner estimate of the rows returned by `stmt`, taken from EXPLAIN."""
+    try:
+        compiled = stmt.compile(
+            dialect=session.bind.dialect, compile_kwargs={"literal_binds": True}
+        )
+    except (CompileError, NotImplementedError):
+        return None
+    connection = await session.connection()
+    result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}")
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def approximate_count(
+    session: AsyncSession,
+    model: Any,
+    stmt: Select | None = None,
+    threshold: int = 0
+) -> int:
+    """Estimated count of `stmt` (or of the whole table) when it is above
+    `threshold`, exact count otherwise.
+    """
+    if stmt is None:
+        estimate = await estimate_table_rows(session, model)
+        count_stmt = select(func.count()).select_from(model)
+    else:
+        estimate = await estimate_query_rows(session, stmt)
+        count_stmt = select(func.count()).select_from(stmt.order_by(None).subquery())
+    if estimate is not None and estimate >= threshold:
+        return estimate
+    return await session.scalar(count_stmt)
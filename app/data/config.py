@@ -42,20 +42,134 @@ class Settings(BaseSettings):
     DB_HOST: str
     DB_PORT: int
 
+    # estimated counts below this many rows are replaced by an exact count
+    APPROXIMATE_COUNT_THRESHOLD: int = 100_000
+
+    # rows fetched per round trip when streaming transactions into analytics
+    ANALYTICS_CHUNK_SIZE: int = 10_000
+
+    # opt-in batching of concurrent finance item inserts
+    WRITE_COALESCING_ENABLED: bool = False
+    WRITE_COALESCING_MAX_BATCH: int = 50
+    WRITE_COALESCING_MAX_DELAY_MS: int = 5
+
     LOG_LEVEL: Literal["INFO", "WARNING", "ERROR", "CRITICAL"]
 
     @property
     def DATABASE_URL(self) -> PostgresDsn:
         return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASS}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
+
+    # read replicas as "host:port", they share the primary credentials
+    DB_REPLICA_HOSTS: list[str] = []
+    DB_REPLICA_MAX_LAG_SECONDS: float = 5.0
+    DB_REPLICA_CHECK_INTERVAL_SECONDS: float = 5.0
+
+    @property
+    def DATABASE_REPLICA_URLS(self) -> list[PostgresDsn]:
+        return [
+            f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASS}@{host}/{self.DB_NAME}"
+            for host in self.DB_REPLICA_HOSTS
+        ]
+    
+    # shards for user-owned tables as "host:port", sharing the primary credentials;
+    # the primary stays the control database for `user` and `currencies`
+    DB_SHARD_HOSTS: list[str] = []
+
+    @property
+    def DATABASE_SHARD_URLS(self) -> list[PostgresDsn]:
+        return [
+            f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASS}@{host}/{self.DB_NAME}"
+            for host in self.DB_SHARD_HOSTS
+        ]
     
     # redis database fields
     REDIS_HOST: str
     REDIS_PORT: int
     
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_POOL_TIMEOUT_SECONDS: float = 5.0
+    REDIS_SOCKET_TIMEOUT_SECONDS: float = 5.0
+    REDIS_CLOSE_TIMEOUT_SECONDS: float = 5.0
+    REDIS_CELERY_MAX_CONNECTIONS: int = 10
+
     @property
     def REDIS_URL(self) -> RedisDsn:
         return f'redis://{self.REDIS_HOST}:{self.REDIS_PORT}/0'
 
+    # outbox relay fields, every consumer group is created on each event stream
+    OUTBOX_RELAY_ENABLED: bool = True
+    OUTBOX_BATCH_SIZE: int = 500
+    OUTBOX_POLL_INTERVAL_SECONDS: float = 0.5
+    OUTBOX_STREAM_MAXLEN: int = 1_000_000
+    OUTBOX_CONSUMER_GROUPS: list[str] = []
+
+    # admission control, reads are shed with 503 once any limit is exceeded
+    ADMISSION_CONTROL_ENABLED: bool = True
+    ADMISSION_MAX_IN_FLIGHT: int = 200
+    ADMISSION_MAX_POOL_WAITERS: int = 20
+    ADMISSION_MAX_POOL_WAIT_MS: float = 500
+    ADMISSION_MAX_LOOP_LAG_MS: float = 200
+    ADMISSION_RETRY_AFTER_SECONDS: int = 2
+    ADMISSION_PROTECTED_PATHS: list[str] = ["/auth/refresh", "/metrics"]
+
+    # event loop monitor, the slow-callback detector logs the stack of any
+    # callback blocking the loop for longer than LOOP_SLOW_CALLBACK_MS
+    LOOP_LAG_SAMPLE_INTERVAL_MS: float = 100
+    LOOP_SLOW_CALLBACK_DETECTOR: bool = False
+    LOOP_SLOW_CALLBACK_MS: float = 100
+
+    # Server-Timing is always sent in debug, otherwise only to callers presenting
+    # the token in X-Server-Timing-Token; phase histograms are always recorded
+    SERVER_TIMING_DEBUG: bool = False
+    SERVER_TIMING_TOKEN: str | None = None
+
+    # service cache fields, local copies expire after CACHE_LOCAL_TTL_SECONDS at most
+    CACHE_LOCAL_MAXSIZE: int = 1024
+    CACHE_LOCAL_TTL_SECONDS: float = 30.0
+    CACHE_INVALIDATION_CHANNEL: str = "cache:invalidate"
+    CACHE_SINGLE_FLIGHT_REDIS_LOCK: bool = False
+    CACHE_LOCK_TIMEOUT_MS: int = 2000
+
+    # most finance items a single batch PATCH or DELETE may touch
+    FINANCE_BATCH_MAX_ITEMS: int = 100
+
+    # statement artifacts, the directory must be shared by app and celery workers
+    STATEMENTS_DIR: str = "statements"
+    # a pending or running job untouched this long is assumed lost and requeued
+    STATEMENT_STALE_AFTER_SECONDS: int = 15 * 60
+
+    # archival fields, finance items older than ARCHIVE_AFTER_DAYS move to the
+    # `archive` schema nightly, at most ARCHIVE_MAX_BATCHES batches per table
+    ARCHIVE_AFTER_DAYS: int = 365
+    ARCHIVE_BATCH_SIZE: int = 5000
+    ARCHIVE_MAX_BATCHES: int = 200
+    ARCHIVE_HOUR_UTC: int = 3
+
+    # sync fields, tombstones of deleted rows are purged nightly after
+    # SYNC_TOMBSTONE_RETENTION_DAYS; clients idle for longer resync from "0.0"
+    SYNC_TOMBSTONE_RETENTION_DAYS: int = 90
+    SYNC_PURGE_BATCH_SIZE: int = 5000
+    SYNC_PURGE_MAX_BATCHES: int = 200
+    SYNC_PURGE_HOUR_UTC: int = 5
+
+    # daily balance fields, snapshots are rebuilt from the items nightly
+    BALANCE_SERIES_MAX_DAYS: int = 1096
+    BALANCE_RECONCILE_BATCH_USERS: int = 500
+    BALANCE_RECONCILE_HOUR_UTC: int = 4
+
+    # rate limit fields, RATE_LIMITS maps a bucket name to "capacity/period"
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMITS: dict[str, str] = {}
+
+    # idempotency fields
+    IDEMPOTENCY_TTL_SECONDS: int = 24 * 60 * 60
+    IDEMPOTENCY_LOCK_SECONDS: int = 10
+
+    # batch fields, POST /batch runs up to this many operations per request
+    BATCH_MAX_OPERATIONS: int = 20
+    # reads of one batch running at once, each holding its own pooled connection
+    BATCH_READ_CONCURRENCY: int = 4
+
     # email fields
     SMTP_USER: EmailStr
     SMTP_PASSWORD: str
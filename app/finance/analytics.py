@@ -0,0 +1,194 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import numpy as np
+
+ROLLING_WINDOWS = (7, 30)
+DEFAULT_EXPONENT = 2
+# ISO 4217 minor unit exponents other than the usual 2
+CURRENCY_EXPONENTS = {
+    **dict.fromkeys(
+        ["BIF", "CLP", "DJF", "GNF", "ISK", "JPY", "KMF", "KRW", "PYG", "RWF",
+         "UGX", "UYI", "VND", "VUV", "XAF", "XOF", "XPF"],
+        0
+    ),
+    **dict.fromkeys(["BHD", "IQD", "JOD", "KWD", "LYD", "OMR", "TND"], 3),
+    **dict.fromkeys(["CLF", "UYW"], 4),
+}
+
+
+def currency_exponent(currency_code: str) -> int:
+    """Digits after the decimal point of the currency's minor unit."""
+    return CURRENCY_EXPONENTS.get(currency_code.upper(), DEFAULT_EXPONENT)
+
+
+class TransactionColumns:
+    """A user's transactions as columnar arrays.
+
+    `amounts` are integer minor units, `dates` are datetime64[D] and
+    `categories` index into `category_names`.
+    """
+
+    def __init__(
+        self,
+        dates: np.ndarray,
+        amounts: np.ndarray,
+        categories: np.ndarray,
+        category_names: list[str]
+    ) -> None:
+        self.dates = dates
+        self.amounts = amounts
+        self.categories = categories
+        self.category_names = category_names
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+
+class TransactionColumnsBuilder:
+    """Accumulates streamed (epoch_seconds, minor_units, category) chunks."""
+
+    def __init__(self) -> None:
+        self._timestamps: list[np.ndarray] = []
+        self._amounts: list[np.ndarray] = []
+        self._categories: list[np.ndarray] = []
+        self._category_codes: dict[str, int] = {}
+
+    def add_chunk(self, rows: list[tuple[int, int, str]]) -> None:
+        if not rows:
+            return
+        timestamps, amounts, categories = zip(*rows)
+        codes = self._category_codes
+        self._timestamps.append(np.array(timestamps, dtype=np.int64))
+        self._amounts.append(np.array(amounts, dtype=np.int64))
+        self._categories.append(np.fromiter(
+            (codes.setdefault(category, len(codes)) for category in categories),
+            dtype=np.int64,
+            count=len(categories)
+        ))
+
+    def build(self) -> TransactionColumns:
+        if not self._amounts:
+            return TransactionColumns(
+                np.empty(0, dtype="datetime64[D]"),
+                np.empty(0, dtype=np.int64),
+                np.empty(0, dtype=np.int64),
+                []
+            )
+        dates = np.concatenate(self._timestamps).astype("datetime64[s]").astype("datetime64[D]")
+        return TransactionColumns(
+            dates,
+            np.concatenate(self._amounts),
+            np.concatenate(self._categories),
+            list(self._category_codes)
+        )
+
+
+def daily_totals(columns: TransactionColumns) -> tuple[np.datetime64, np.ndarray]:
+    start = columns.dates.min()
+    day_index = (columns.dates - start).astype(np.int64)
+    return start, np.bincount(day_index, weights=columns.amounts).astype(np.int64)
+
+
+def rolling_averages(daily: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over `window` days, in minor units, for every day."""
+    cumulative = np.concatenate(([0], np.cumsum(daily)))
+    upper = np.arange(1, len(daily) + 1)
+    lower = np.maximum(upper - window, 0)
+    return (cumulative[upper] - cumulative[lower]) / (upper - lower)
+
+
+def monthly_totals(columns: TransactionColumns) -> tuple[np.ndarray, np.ndarray]:
+    months = columns.dates.astype("datetime64[M]")
+    start = months.min()
+    month_index = (months - start).astype(np.int64)
+    totals = np.bincount(month_index, weights=columns.amounts).astype(np.int64)
+    return start + np.arange(len(totals)), totals
+
+
+def category_share(columns: TransactionColumns) -> dict[str, float]:
+    totals = np.bincount(
+        columns.categories, weights=columns.amounts, minlength=len(columns.category_names)
+    )
+    grand_total = totals.sum()
+    if not grand_total:
+        return {name: 0.0 for name in columns.category_names}
+    return dict(zip(columns.category_names, (totals / grand_total).round(4).tolist()))
+
+
+def forecast_next(totals: np.ndarray, history: int = 12) -> float:
+    """Least-squares linear trend over the last `history` months, never negative."""
+    recent = totals[-history:]
+    if len(recent) < 2:
+        return float(recent[-1]) if len(recent) else 0.0
+    slope, intercept = np.polyfit(np.arange(len(recent)), recent, 1)
+    return max(0.0, slope * len(recent) + intercept)
+
+
+def trailing_average(
+    start: np.datetime64, daily: np.ndarray, today: np.datetime64, window: int
+) -> float:
+    """Mean of the `window` days ending `today`, days without spending included."""
+    today_index = int((today - start).astype(np.int64))
+    if today_index < 0:
+        return 0.0
+    if today_index >= len(daily):
+        daily = np.concatenate((daily, np.zeros(today_index + 1 - len(daily), dtype=daily.dtype)))
+    return rolling_averages(daily[:today_index + 1], window)[-1]
+
+
+def spending_analytics(
+    columns: TransactionColumns,
+    exponent: int = DEFAULT_EXPONENT,
+    today: np.datetime64 | None = None
+) -> dict:
+    """Rolling averages, month-over-month deltas, category share and a next-month forecast.
+
+    `columns` hold amounts in minor units of a currency with `exponent` decimal
+    digits; rolling averages are for the windows ending `today` (UTC by default).
+    """
+    quantum = Decimal(1).scaleb(-exponent)
+
+    def to_major_units(minor: float) -> Decimal:
+        return Decimal(round(minor)).scaleb(-exponent).quantize(quantum)
+
+    if not len(columns):
+        return {
+            "transactions": 0,
+            "total": to_major_units(0),
+            "rolling_averages": {f"{window}d": to_major_units(0) for window in ROLLING_WINDOWS},
+            "monthly": [],
+            "category_share": {},
+            "forecast_next_month": to_major_units(0)
+        }
+
+    if today is None:
+        today = np.datetime64(datetime.now(timezone.utc).date(), "D")
+    start, daily = daily_totals(columns)
+    months, totals = monthly_totals(columns)
+    deltas = np.diff(totals, prepend=totals[0])
+    previous = np.concatenate(([0], totals[:-1]))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        delta_pct = np.where(previous > 0, deltas / previous * 100, np.nan)
+
+    return {
+        "transactions": len(columns),
+        "total": to_major_units(columns.amounts.sum()),
+        "rolling_averages": {
+            f"{window}d": to_major_units(trailing_average(start, daily, today, window))
+            for window in ROLLING_WINDOWS
+        },
+        "monthly": [
+            {
+                "month": month,
+                "total": to_major_units(total),
+                "delta": to_major_units(delta) if i else None,
+                "delta_pct": None if i == 0 or np.isnan(pct) else round(float(pct), 2)
+            }
+            for i, (month, total, delta, pct) in enumerate(
+                zip(months.astype("datetime64[D]").tolist(), totals, deltas, delta_pct)
+            )
+        ],
+        "category_share": category_share(columns),
+        "forecast_next_month": to_major_units(forecast_next(totals))
+    }
@@ -1,6 +1,6 @@
 from typing import TYPE_CHECKING
 import uuid
-from sqlalchemy import ForeignKey
+from sqlalchemy import BigInteger, FetchedValue, ForeignKey, text
 from sqlalchemy.orm import declared_attr
 
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -39,4 +39,30 @@ class CurrencyRelationMixin:
         return relationship(
             "CurrencyModel", 
             back_populates=cls._currenecy_back_populates
-        )
\ No newline at end of file
+        )
+
+
+class ChangeTrackingMixin:
+    """Columns maintained by the `track_change` trigger for the sync feed.
+
+    `change_version` comes from one global sequence and is bumped on every
+    insert and update; `change_xid` is the writing transaction id. The sync
+    feed pages on (change_xid, change_version), since only xids are known to
+    be finished below a snapshot's xmin.
+    """
+
+    @declared_attr
+    def change_version(cls) -> Mapped[int]:
+        return mapped_column(
+            BigInteger,
+            server_default=text("nextval('change_version_seq')"),
+            server_onupdate=FetchedValue()
+        )
+
+    @declared_attr
+    def change_xid(cls) -> Mapped[int]:
+        return mapped_column(
+            BigInteger,
+            server_default=text("pg_current_xact_id()::text::bigint"),
+            server_onupdate=FetchedValue()
+        )
@@ -2,11 +2,12 @@ from datetime import datetime
 from typing import TYPE_CHECKING
 from decimal import Decimal
 
-from .mixins import CurrencyRelationMixin, UserRelationMixin
+from .mixins import ChangeTrackingMixin, CurrencyRelationMixin, UserRelationMixin
 from app.utils.database.database import Base, BaseUUID
 
-from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import ARRAY, String, Text
+from sqlalchemy.orm import Mapped, declared_attr, mapped_column, relationship
+from sqlalchemy import ARRAY, TIMESTAMP, Index, String, Text
+from sqlalchemy.sql import func
 
 if TYPE_CHECKING:
     from app.auth.models import ProfileModel
@@ -25,11 +26,27 @@ class CurrencyModel(Base):
         return 'Profile currency code: ' + self.currency_code
     
 
-class FinanceEntityModel(CurrencyRelationMixin, UserRelationMixin, BaseUUID):
+class FinanceEntityModel(ChangeTrackingMixin, CurrencyRelationMixin, UserRelationMixin, BaseUUID):
     __abstract__ = True
     comment: Mapped[str] = mapped_column(Text)
     value: Mapped[Decimal]
     category: Mapped[str]
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True),
+        server_default=func.now()
+    )
+
+    @declared_attr.directive
+    def __table_args__(cls):
+        return (
+            Index(f"ix_{cls.__tablename__}_user_id_created_at", "user_id", "created_at"),
+            Index(
+                f"ix_{cls.__tablename__}_user_id_change_xid",
+                "user_id", "change_xid", "change_version"
+            ),
+            # a few pages per block range, lets archival find old rows without a btree
+            Index(f"ix_{cls.__tablename__}_created_at_brin", "created_at", postgresql_using="brin"),
+        )
     
     def __str__(self):
         return str(self.value) + ' ' + self.currency_code
@@ -49,7 +66,7 @@ class IncomeModel(FinanceEntityModel):
     _currenecy_back_populates = "income"
     
 
-class BaseTypeModel(Base, UserRelationMixin):
+class BaseTypeModel(Base, ChangeTrackingMixin, UserRelationMixin):
     __abstract__ = True
     _user_primary_key = True
     categories: Mapped[list[str]] = mapped_column(ARRAY(String))
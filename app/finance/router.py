@@ -1,10 +1,17 @@
-from fastapi import APIRouter, Depends
-from fastapi_cache.decorator import cache
+import uuid
+
+from fastapi import APIRouter, Depends, Query, Response
 from app.auth.dependencies import get_current_active_user, get_current_superuser, get_current_verified_user
 
-from app.auth.models import UserModel
-from app.finance.schemas import Currency, BaseFinanceType, FinanceItem, FinanceItemCreate, FinanceType
+from app.auth.schemas import User
+from app.data.config import settings
+from app.finance.schemas import (
+    BatchItemResult, Currency, BaseFinanceType, FinanceItem, FinanceItemCreate,
+    FinanceItemsPatch, FinanceType, SpendingAnalytics
+)
 from app.finance.service import FinanceService
+from app.utils.idempotency import IdempotencyGuard, get_idempotency_guard
+from app.utils.responses import ORJSONResponse
 
 
 finance_router = APIRouter(
@@ -13,14 +20,13 @@ finance_router = APIRouter(
 )
 
 @finance_router.get("")
-@cache(expire=3600)
 async def get_currencies() -> list[Currency]:
-    return await FinanceService.get_currencies_list()
+    return await FinanceService.get_all_currencies()
 
 
 @finance_router.get("/income/category")
 async def get_income_types(
-    current_user: UserModel = Depends(get_current_verified_user)
+    current_user: User = Depends(get_current_verified_user)
 ) -> list[str]:
     return await FinanceService.get_categories_list(
         finance_type=FinanceService.INCOME, 
@@ -30,7 +36,7 @@ async def get_income_types(
 
 @finance_router.get("/expense/category")
 async def get_expense_types(
-    current_user: UserModel = Depends(get_current_verified_user)
+    current_user: User = Depends(get_current_verified_user)
 ) -> list[str]:
     return await FinanceService.get_categories_list(
         finance_type=FinanceService.EXPENSE, 
@@ -38,10 +44,21 @@ async def get_expense_types(
     )
 
 
+@finance_router.get("/expense/analytics")
+async def get_expense_analytics(
+    currency_code: str = Query(max_length=3, examples=['USD']),
+    current_user: User = Depends(get_current_verified_user)
+) -> SpendingAnalytics:
+    return await FinanceService.get_spending_analytics(
+        user_id=current_user.id,
+        currency_code=currency_code
+    )
+
+
 @finance_router.post("/income/category")
 async def adding_new_income_category(
     new_category = str,
-    current_user: UserModel = Depends(get_current_verified_user),
+    current_user: User = Depends(get_current_verified_user),
 ) -> list[str]:
     return await FinanceService.adding_finance_category(
         finance_type=FinanceService.INCOME,
@@ -53,7 +70,7 @@ async def adding_new_income_category(
 @finance_router.post("/expense/category")
 async def adding_new_expense_category(
     new_category = str,
-    current_user: UserModel = Depends(get_current_verified_user),
+    current_user: User = Depends(get_current_verified_user),
 ) -> list[str]:
     return await FinanceService.adding_finance_category(
         finance_type=FinanceService.EXPENSE,
@@ -62,25 +79,91 @@ async def adding_new_expense_category(
     )
 
 
-@finance_router.post("/income")
+@finance_router.post("/income", response_model=FinanceItem)
 async def create_income(
     finance_item: FinanceItemCreate, 
-    current_user: UserModel = Depends(get_current_active_user)
-) -> FinanceItem:
-    return await FinanceService.adding_finance_item(
-        finance_type=FinanceService.INCOME,
-        user_id=current_user.id,
-        finance=finance_item
+    current_user: User = Depends(get_current_active_user),
+    idempotency: IdempotencyGuard = Depends(get_idempotency_guard)
+) -> Response:
+    return await idempotency.run(
+        current_user.id,
+        FinanceItem,
+        lambda: FinanceService.adding_finance_item(
+            finance_type=FinanceService.INCOME,
+            user_id=current_user.id,
+            finance=finance_item
+        )
     )
 
 
-@finance_router.post("/expense")
+@finance_router.post("/expense", response_model=FinanceItem)
 async def create_expense(
     finance_item: FinanceItemCreate, 
-    current_user: UserModel = Depends(get_current_active_user)
-) -> FinanceItem:
-    return await FinanceService.adding_finance_item(
-        finance_type=FinanceService.EXPENSE,
-        user_id=current_user.id,
-        finance=finance_item
+    current_user: User = Depends(get_current_active_user),
+    idempotency: IdempotencyGuard = Depends(get_idempotency_guard)
+) -> Response:
+    return await idempotency.run(
+        current_user.id,
+        FinanceItem,
+        lambda: FinanceService.adding_finance_item(
+            finance_type=FinanceService.EXPENSE,
+            user_id=current_user.id,
+            finance=finance_item
+        )
+    )
+
+
+@finance_router.patch("/income", response_model=list[BatchItemResult])
+async def update_incomes(
+    patch: FinanceItemsPatch,
+    current_user: User = Depends(get_current_active_user)
+) -> Response:
+    return ORJSONResponse(
+        await FinanceService.update_finance_items(
+            finance_type=FinanceService.INCOME,
+            user_id=current_user.id,
+            patches=patch.items
+        )
+    )
+
+
+@finance_router.patch("/expense", response_model=list[BatchItemResult])
+async def update_expenses(
+    patch: FinanceItemsPatch,
+    current_user: User = Depends(get_current_active_user)
+) -> Response:
+    return ORJSONResponse(
+        await FinanceService.update_finance_items(
+            finance_type=FinanceService.EXPENSE,
+            user_id=current_user.id,
+            patches=patch.items
+        )
+    )
+
+
+@finance_router.delete("/income", response_model=list[BatchItemResult])
+async def delete_incomes(
+    ids: list[uuid.UUID] = Query(min_length=1, max_length=settings.FINANCE_BATCH_MAX_ITEMS),
+    current_user: User = Depends(get_current_active_user)
+) -> Response:
+    return ORJSONResponse(
+        await FinanceService.delete_finance_items(
+            finance_type=FinanceService.INCOME,
+            user_id=current_user.id,
+            ids=list(dict.fromkeys(ids))
+        )
+    )
+
+
+@finance_router.delete("/expense", response_model=list[BatchItemResult])
+async def delete_expenses(
+    ids: list[uuid.UUID] = Query(min_length=1, max_length=settings.FINANCE_BATCH_MAX_ITEMS),
+    current_user: User = Depends(get_current_active_user)
+) -> Response:
+    return ORJSONResponse(
+        await FinanceService.delete_finance_items(
+            finance_type=FinanceService.EXPENSE,
+            user_id=current_user.id,
+            ids=list(dict.fromkeys(ids))
+        )
     )
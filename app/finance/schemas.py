@@ -1,6 +1,10 @@
+from datetime import date, datetime
 from decimal import Decimal
+from typing import Literal
 import uuid
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
+
+from app.data.config import settings
 
 
 class Currency(BaseModel):
@@ -28,7 +32,57 @@ class FinanceItemCreateDB(FinanceItemCreate):
 
 class FinanceItem(FinanceItemCreateDB):
     id: uuid.UUID
+    created_at: datetime
     
 
+class FinanceItemPatch(BaseModel):
+    id: uuid.UUID
+    currency_code: str | None = Field(None, examples=['USD'], max_length=3)
+    category: str | None = None
+    value: Decimal | None = None
+    comment: str | None = None
+
+    @model_validator(mode="after")
+    def check_changes(self) -> "FinanceItemPatch":
+        if not self.model_dump(exclude={"id"}, exclude_none=True):
+            raise ValueError("nothing to update")
+        return self
+
+
+class FinanceItemsPatch(BaseModel):
+    items: list[FinanceItemPatch] = Field(
+        min_length=1, max_length=settings.FINANCE_BATCH_MAX_ITEMS
+    )
+
+    @model_validator(mode="after")
+    def check_unique_ids(self) -> "FinanceItemsPatch":
+        if len({item.id for item in self.items}) != len(self.items):
+            raise ValueError("item ids must be unique")
+        return self
+
+
+class BatchItemResult(BaseModel):
+    id: uuid.UUID
+    status: Literal["updated", "deleted", "not_found"]
+    item: FinanceItem | None = None
+
+
 class FinanceType(BaseFinanceType):
     id: uuid.UUID
+
+
+class MonthlySpending(BaseModel):
+    month: date
+    total: Decimal
+    delta: Decimal | None
+    delta_pct: float | None
+
+
+class SpendingAnalytics(BaseModel):
+    currency_code: str
+    transactions: int
+    total: Decimal
+    rolling_averages: dict[str, Decimal] = Field(examples=[{"7d": "12.50", "30d": "10.00"}])
+    monthly: list[MonthlySpending]
+    category_share: dict[str, float] = Field(examples=[{"Food": 0.6, "Transport": 0.4}])
+    forecast_next_month: Decimal
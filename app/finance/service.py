@@ -1,27 +1,41 @@
+import asyncio
+import functools
 import json
 import os
 import uuid
 from fastapi import HTTPException, status
-from app.auth.dao import UserDAO
-from app.auth.models import UserModel
-
-from app.auth.schemas import User
-from app.finance.schemas import BaseFinanceType, FinanceItem, FinanceItemCreate, FinanceItemCreateDB
+from sqlalchemy import BigInteger, Row, cast, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.finance.schemas import (
+    BaseFinanceType, Currency, FinanceItem, FinanceItemCreate, FinanceItemPatch
+)
 
+from .analytics import TransactionColumnsBuilder, currency_exponent, spending_analytics
 from .models import CurrencyModel, ExpenseModel, ExpenseTypeModel, IncomeModel, IncomeTypeModel
 from .dao import ExpenseDAO, ExpenseTypeDAO, IncomeDAO, IncomeTypeDAO, CurrencyDAO
-from app.utils.database.database import async_session_maker
+from app.archive.dao import ArchivedExpenseDAO
+from app.archive.service import ArchiveService
+from app.balances.service import BalanceService
+from app.dao.coalescer import WriteCoalescer
+from app.data.config import settings
+from app.outbox.service import OutboxService
+from app.utils.cache import cached, service_cache
+from app.utils.responses import orm_to_dict
+from app.utils.database.database import async_session_maker, shard_router, user_session
+from app.utils.database.replicas import pin_to_primary
+from app.utils.exceptions import InvalidFinanceBatchException, UnknownCurrencyException
 
 
 class FinanceService:
     EXPENSE = 'expense'
     INCOME = 'income'
-    _base_incomes = [
+    BASE_INCOMES = [
         "Salary", "Investment", 
         "Pocket Money", "Pension", 
         "Gift", "Other"
     ]
-    _base_expencies = [
+    BASE_EXPENCIES = [
         "Food",
         "Health",
         "Transport",
@@ -33,6 +47,7 @@ class FinanceService:
         "Gift",
         "Other",
     ]
+    _coalescers: dict[str, WriteCoalescer] = {}
 
     @staticmethod
     async def init_currencies():
@@ -46,54 +61,54 @@ class FinanceService:
                 await session.commit()
 
 
-    @staticmethod
-    async def adding_base_categories(db_user_id: User):
-        async with async_session_maker() as session:
-            await IncomeTypeDAO.add(
-                session, 
-                {
-                    "user_id": db_user_id, 
-                    "categories": FinanceService._base_incomes
-                }
-            )
-            await ExpenseTypeDAO.add(
-                session, 
-                {
-                    "user_id": db_user_id, 
-                    "categories": FinanceService._base_expencies
-                }
-            )
-            await UserDAO.find_all_with_joinedload_option(
-                session,
-                load=UserModel.expense_types
-            )
-            await session.commit()
-
-
     @staticmethod
     async def adding_finance_category(
         finance_type: str,
         user_id: uuid.UUID, 
         new_category: str
     ):
-        async with async_session_maker() as session:
-            if finance_type == FinanceService.INCOME:
-                dao = IncomeTypeDAO
-            elif finance_type == FinanceService.EXPENSE:
-                dao = ExpenseTypeDAO
-            finance_type_instance: ExpenseTypeModel | IncomeTypeModel = \
-                await dao.find_one_or_none(session, user_id=user_id)
-            categories = finance_type_instance.categories
-            categories.append(new_category)
-            db_instance: IncomeTypeModel | ExpenseTypeModel = \
-            await dao.update(
-                session,
-                user_id == user_id,
-                obj_in=BaseFinanceType(
-                    categories=categories
-                )
+        async with user_session(user_id) as session:
+            categories = await FinanceService.append_category(
+                session, finance_type, user_id, new_category
             )
             await session.commit()
+        await service_cache.invalidate_tags(f"categories:{user_id}")
+        return categories
+
+    @staticmethod
+    async def append_category(
+        session: AsyncSession,
+        finance_type: str,
+        user_id: uuid.UUID,
+        new_category: str
+    ) -> list[str]:
+        """Add a category in the caller's transaction.
+
+        The caller commits and then invalidates the `categories:{user_id}` tag.
+        """
+        # read-modify-write of the categories array must not see a stale replica
+        pin_to_primary(session)
+        if finance_type == FinanceService.INCOME:
+            dao = IncomeTypeDAO
+        elif finance_type == FinanceService.EXPENSE:
+            dao = ExpenseTypeDAO
+        finance_type_instance: ExpenseTypeModel | IncomeTypeModel = \
+            await dao.find_one_by(session, "user_id", user_id)
+        categories = finance_type_instance.categories
+        categories.append(new_category)
+        [db_instance] = await dao.update(
+            session,
+            dao.model.user_id == user_id,
+            obj_in=BaseFinanceType(
+                categories=categories
+            )
+        )
+        await OutboxService.emit(
+            session,
+            OutboxService.FINANCE_STREAM,
+            f"{finance_type}_category.added",
+            {"user_id": user_id, "category": new_category}
+        )
         return db_instance.categories
     
     @staticmethod
@@ -102,21 +117,190 @@ class FinanceService:
         user_id: uuid.UUID, 
         finance: FinanceItemCreate
     ) -> IncomeModel | ExpenseModel:
-        async with async_session_maker() as session:
-            if finance_type == FinanceService.INCOME:
-                dao = IncomeDAO
-            elif finance_type == FinanceService.EXPENSE:
-                dao = ExpenseDAO
-            db_instance: IncomeModel | ExpenseModel = \
-                await dao.add(
+        if settings.WRITE_COALESCING_ENABLED:
+            if not await FinanceService._currencies_exist({finance.currency_code}):
+                raise UnknownCurrencyException
+            return await FinanceService._get_coalescer(finance_type).add(
+                {**finance.model_dump(), "user_id": user_id}
+            )
+        async with user_session(user_id) as session:
+            db_instance = await FinanceService.insert_finance_item(
+                session, finance_type, user_id, finance
+            )
+            await session.commit()
+        return db_instance
+
+    @staticmethod
+    async def insert_finance_item(
+        session: AsyncSession,
+        finance_type: str,
+        user_id: uuid.UUID,
+        finance: FinanceItemCreate
+    ) -> IncomeModel | ExpenseModel | None:
+        """Insert one item in the caller's transaction, None if the insert failed."""
+        if not await FinanceService._currencies_exist({finance.currency_code}):
+            raise UnknownCurrencyException
+        if finance_type == FinanceService.INCOME:
+            dao = IncomeDAO
+        elif finance_type == FinanceService.EXPENSE:
+            dao = ExpenseDAO
+        db_instance: IncomeModel | ExpenseModel = \
+            await dao.add(
+                session,
+                obj_in={**finance.model_dump(), "user_id": user_id}
+            )
+        await FinanceService._on_items_created(finance_type, session, [db_instance])
+        return db_instance
+
+    @staticmethod
+    async def _on_items_created(
+        finance_type: str,
+        session: AsyncSession,
+        db_instances: list[IncomeModel | ExpenseModel]
+    ) -> None:
+        db_instances = [db_instance for db_instance in db_instances if db_instance is not None]
+        await OutboxService.emit_many(session, [
+            OutboxService.event(
+                OutboxService.FINANCE_STREAM,
+                f"{finance_type}.created",
+                orm_to_dict(FinanceItem, db_instance)
+            )
+            for db_instance in db_instances
+        ])
+        await BalanceService.record(session, [
+            FinanceService._movement(finance_type, db_instance) for db_instance in db_instances
+        ])
+
+    @staticmethod
+    def _movement(
+        finance_type: str,
+        item: IncomeModel | ExpenseModel | Row,
+        reverse: bool = False
+    ) -> tuple:
+        """The item's effect on its currency balance, undone when `reverse`."""
+        amount = item.value if finance_type == FinanceService.INCOME else -item.value
+        return item.user_id, item.currency_code, item.created_at, -amount if reverse else amount
+
+    @staticmethod
+    async def _find_items(
+        session: AsyncSession,
+        finance_type: str,
+        user_id: uuid.UUID,
+        ids: list[uuid.UUID]
+    ) -> list[tuple]:
+        """Balance movements of the items as they are now, read before changing them.
+
+        The rows stay locked until commit, so a concurrent change to the same
+        items cannot slip in between this read and the caller's write.
+        """
+        dao = FinanceService._item_dao(finance_type)
+        rows = await dao.lock_rows(session, ids, dao.model.user_id == user_id)
+        return [
+            (row.id, FinanceService._movement(finance_type, row, reverse=True))
+            for row in rows
+        ]
+
+    @staticmethod
+    async def _currencies_exist(codes: set[str]) -> bool:
+        # shards cannot reference `currencies` on the control database, so the
+        # foreign key that rejects unknown codes is missing there
+        if not shard_router.enabled or not codes:
+            return True
+        known = await FinanceService.get_currencies_list(
+            CurrencyModel.currency_code.in_(codes), limit=len(codes)
+        )
+        return len(known) == len(codes)
+
+    @staticmethod
+    def _item_dao(finance_type: str) -> type[IncomeDAO] | type[ExpenseDAO]:
+        return IncomeDAO if finance_type == FinanceService.INCOME else ExpenseDAO
+
+    @staticmethod
+    async def update_finance_items(
+        finance_type: str,
+        user_id: uuid.UUID,
+        patches: list[FinanceItemPatch]
+    ) -> list[dict]:
+        dao = FinanceService._item_dao(finance_type)
+        codes = {patch.currency_code for patch in patches if patch.currency_code is not None}
+        if not await FinanceService._currencies_exist(codes):
+            raise InvalidFinanceBatchException
+        async with user_session(user_id) as session:
+            previous = await FinanceService._find_items(
+                session, finance_type, user_id, [patch.id for patch in patches]
+            )
+            try:
+                db_instances = await dao.update_bulk(
                     session,
-                    obj_in=FinanceItemCreateDB(
-                        **finance.model_dump(),
-                        user_id=user_id
-                    )
+                    [patch.model_dump(exclude_none=True) for patch in patches],
+                    dao.model.user_id == user_id
+                )
+            except IntegrityError:
+                raise InvalidFinanceBatchException
+            await OutboxService.emit_many(session, [
+                OutboxService.event(
+                    OutboxService.FINANCE_STREAM,
+                    f"{finance_type}.updated",
+                    orm_to_dict(FinanceItem, db_instance)
                 )
+                for db_instance in db_instances
+            ])
+            updated = {db_instance.id: db_instance for db_instance in db_instances}
+            await BalanceService.record(session, [
+                *(movement for item_id, movement in previous if item_id in updated),
+                *(FinanceService._movement(finance_type, db_instance) for db_instance in db_instances)
+            ])
             await session.commit()
-        return db_instance
+        return [
+            {"id": patch.id, "status": "updated", "item": orm_to_dict(FinanceItem, updated[patch.id])}
+            if patch.id in updated else {"id": patch.id, "status": "not_found"}
+            for patch in patches
+        ]
+
+    @staticmethod
+    async def delete_finance_items(
+        finance_type: str,
+        user_id: uuid.UUID,
+        ids: list[uuid.UUID]
+    ) -> list[dict]:
+        dao = FinanceService._item_dao(finance_type)
+        async with user_session(user_id) as session:
+            previous = await FinanceService._find_items(session, finance_type, user_id, ids)
+            deleted = set(await dao.delete_bulk(session, ids, dao.model.user_id == user_id))
+            await OutboxService.emit_many(session, [
+                OutboxService.event(
+                    OutboxService.FINANCE_STREAM,
+                    f"{finance_type}.deleted",
+                    {"id": item_id, "user_id": user_id}
+                )
+                for item_id in deleted
+            ])
+            await BalanceService.record(
+                session, [movement for item_id, movement in previous if item_id in deleted]
+            )
+            await session.commit()
+        return [
+            {"id": item_id, "status": "deleted" if item_id in deleted else "not_found"}
+            for item_id in ids
+        ]
+
+    @staticmethod
+    def _get_coalescer(finance_type: str) -> WriteCoalescer:
+        coalescer = FinanceService._coalescers.get(finance_type)
+        if coalescer is None:
+            coalescer = WriteCoalescer(
+                IncomeDAO if finance_type == FinanceService.INCOME else ExpenseDAO,
+                max_batch=settings.WRITE_COALESCING_MAX_BATCH,
+                max_delay=settings.WRITE_COALESCING_MAX_DELAY_MS / 1000,
+                on_flush=functools.partial(FinanceService._on_items_created, finance_type)
+            )
+            FinanceService._coalescers[finance_type] = coalescer
+        return coalescer
+
+    @staticmethod
+    async def close_coalescers() -> None:
+        for coalescer in FinanceService._coalescers.values():
+            await coalescer.close()
 
     @staticmethod
     async def get_currencies_list(*filter, **filter_by) -> list[CurrencyModel]:
@@ -125,18 +309,54 @@ class FinanceService:
         return currencies
 
     @staticmethod
+    @cached(list[Currency], ttl=3600, stale_ttl=600, tags=lambda: ["currencies"])
+    async def get_all_currencies() -> list[Currency]:
+        return await FinanceService.get_currencies_list()
+
+    @staticmethod
+    @cached(
+        list[str],
+        ttl=300,
+        stale_ttl=60,
+        tags=lambda finance_type, user_id: [f"categories:{user_id}"]
+    )
     async def get_categories_list(
         finance_type: str, 
         user_id: uuid.UUID, 
     ) -> list[str]:
-        async with async_session_maker() as session:
+        async with user_session(user_id) as session:
             if finance_type == 'income':
                 dao = IncomeTypeDAO
             elif finance_type == 'expense':
                 dao = ExpenseTypeDAO
             result: ExpenseTypeModel | IncomeTypeModel = \
-                await dao.find_one_or_none(
-                    session,
-                    user_id=user_id
-                )
+                await dao.find_one_by(session, "user_id", user_id)
             return result.categories
+
+    @staticmethod
+    async def get_spending_analytics(
+        user_id: uuid.UUID,
+        currency_code: str
+    ) -> dict:
+        builder = TransactionColumnsBuilder()
+        exponent = currency_exponent(currency_code)
+        async with user_session(user_id) as session:
+            daos = [ExpenseDAO]
+            # analytics span the whole history, so archived expenses count too
+            if await ArchiveService.needs_archive(session, user_id, None):
+                daos.append(ArchivedExpenseDAO)
+            for dao in daos:
+                async for chunk in dao.stream_partitions(
+                    session,
+                    [
+                        cast(func.extract("epoch", dao.model.created_at), BigInteger),
+                        cast(func.round(dao.model.value * 10 ** exponent), BigInteger),
+                        dao.model.category
+                    ],
+                    user_id=user_id,
+                    currency_code=currency_code,
+                    chunk_size=settings.ANALYTICS_CHUNK_SIZE
+                ):
+                    builder.add_chunk(chunk)
+        analytics = await asyncio.to_thread(spending_analytics, builder.build(), exponent)
+        return {"currency_code": currency_code, **analytics}
@@ -0,0 +1,74 @@
+import atexit
+import logging
+import queue
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from pythonjsonlogger import jsonlogger
+
+from app.data.config import settings
+
+correlation_id: ContextVar[str | None] = ContextVar("correlation_id", default=None)
+
+
+def new_correlation_id() -> str:
+    return uuid.uuid4().hex
+
+
+class CorrelationIdFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.correlation_id = correlation_id.get()
+        return True
+
+
+class CustomJsonFormatter(jsonlogger.JsonFormatter):
+    def add_fields(self, log_record, record, message_dict):
+        super().add_fields(log_record, record, message_dict)
+        log_record["timestamp"] = datetime.fromtimestamp(
+            record.created, tz=timezone.utc
+        ).isoformat()
+        log_record["level"] = record.levelname
+        log_record["logger"] = record.name
+
+
+_listener: QueueListener | None = None
+
+
+def setup_logging() -> None:
+    """Route the root logger through a queue so callers never wait on log I/O.
+
+    The correlation id is read by a filter on the queue handler, i.e. in the
+    logging task's context, before the record crosses to the listener thread.
+    """
+    global _listener
+    if _listener is not None:
+        return
+    log_queue = queue.SimpleQueue()
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(
+        CustomJsonFormatter("%(timestamp)s %(level)s %(logger)s %(message)s %(correlation_id)s")
+    )
+
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.addFilter(CorrelationIdFilter())
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(settings.LOG_LEVEL)
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+logger = logging.getLogger("app")
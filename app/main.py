@@ -1,22 +1,38 @@
 from app.auth.router import auth_router, user_router
 from .data.config import settings
 from app.finance.router import finance_router
-
+from app.statements.router import statement_router
+from app.balances.router import balance_router
+from app.batch.router import batch_router
+from app.sync.router import sync_router
+
+from app.logger import setup_logging
+from app.utils.admission import AdmissionControlMiddleware
+from app.utils.correlation import CorrelationIdMiddleware, sentry_before_send
 from app.utils.lifespan_init import lifespan
+from app.utils.timing import ServerTimingMiddleware
+from app.utils.responses import ORJSONResponse
 from app.admin.views import init_views
 
 import sentry_sdk
 from fastapi import FastAPI
 
 
+setup_logging()
+
 sentry_sdk.init(
     dsn=settings.SENTRY_URL,
     traces_sample_rate=1.0,
     profiles_sample_rate=1.0,
+    before_send=sentry_before_send,
 )
 
 
-app = FastAPI(title="Finance App", lifespan=lifespan)
+app = FastAPI(
+    title="Finance App",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
+)
 
 from prometheus_fastapi_instrumentator import Instrumentator
 
@@ -24,8 +40,16 @@ Instrumentator(
     should_group_status_codes=False, excluded_handlers=[".*admin*.", "/metrics"]
 ).instrument(app).expose(app)
 
+app.add_middleware(AdmissionControlMiddleware)
+app.add_middleware(ServerTimingMiddleware)
+app.add_middleware(CorrelationIdMiddleware)
+
 app.include_router(router=auth_router)
 app.include_router(router=user_router)
 app.include_router(router=finance_router)
+app.include_router(router=sync_router)
+app.include_router(router=statement_router)
+app.include_router(router=balance_router)
+app.include_router(router=batch_router)
 
 init_views(app)
@@ -0,0 +1,33 @@
+from typing import Any
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.dao.base import BaseDAO
+from app.utils.database.replicas import mark_written
+from app.outbox.models import OutboxEventModel
+
+
+class OutboxEventDAO(BaseDAO):
+    model = OutboxEventModel
+
+    @classmethod
+    async def insert(cls, session: AsyncSession, events: list[dict[str, Any]]) -> None:
+        """Insert events in the caller's transaction.
+
+        Unlike `add`/`add_bulk`, errors propagate: an event that was not written
+        must fail the caller's transaction instead of being dropped.
+        """
+        mark_written(session)
+        await session.execute(insert(cls.model), events)
+
+    @classmethod
+    async def lock_batch(cls, session: AsyncSession, limit: int) -> list[OutboxEventModel]:
+        stmt = (
+            select(cls.model)
+            .order_by(cls.model.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await session.execute(stmt)
+        return result.scalars().all()
@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+
+from prometheus_client import Counter, Gauge, Histogram
+from redis import asyncio as aioredis
+from redis.exceptions import ResponseError
+from sqlalchemy import func, select
+
+from app.data.config import settings
+from app.outbox.dao import OutboxEventDAO
+from app.outbox.models import OutboxEventModel
+from app.outbox.service import OutboxService
+from app.utils.database.database import all_shards, shard_router, shard_session
+from app.utils.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+outbox_events_published_total = Counter(
+    "outbox_events_published_total", "Outbox events relayed to Redis Streams", ["stream"]
+)
+outbox_relay_errors_total = Counter(
+    "outbox_relay_errors_total", "Relay batches that failed and will be retried"
+)
+outbox_relay_batch_seconds = Histogram(
+    "outbox_relay_batch_seconds", "Time to publish and clear one outbox batch"
+)
+outbox_relay_lag_seconds = Gauge(
+    "outbox_relay_lag_seconds", "Age of the oldest event in the last relayed batch", ["database"]
+)
+outbox_consumer_group_lag = Gauge(
+    "outbox_consumer_group_lag",
+    "Stream entries not yet delivered to a consumer group",
+    ["stream", "group"]
+)
+outbox_consumer_group_pending = Gauge(
+    "outbox_consumer_group_pending",
+    "Entries delivered to a consumer group but not acknowledged",
+    ["stream", "group"]
+)
+
+# pg advisory lock id held by whichever worker is currently relaying, so
+# events leave the table in id order even with several app workers; ids are
+# taken at insert, so two concurrent transactions may still commit out of it
+RELAY_LOCK_KEY = 0x6F7574626F78
+
+
+class OutboxRelay:
+    """Drains `outbox_events` into Redis Streams in batches.
+
+    An event is deleted only in the transaction that saw its XADD succeed, so
+    delivery is at-least-once; consumers dedupe on the `event_id` field.
+    Each database with an `outbox_events` table gets its own relay: the
+    control one (`shard=None`) and, when sharding is enabled, every shard.
+    """
+
+    def __init__(
+        self,
+        redis: aioredis.Redis,
+        streams: list[str],
+        groups: list[str],
+        batch_size: int = 500,
+        poll_interval: float = 0.5,
+        stream_maxlen: int | None = None,
+        metrics_interval: float = 15.0,
+        shard: int | None = None
+    ) -> None:
+        self.redis = redis
+        self.shard = shard
+        self.database = "control" if shard is None else f"shard-{shard}"
+        self.streams = streams
+        self.groups = groups
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.stream_maxlen = stream_maxlen
+        self.metrics_interval = metrics_interval
+        self._task: asyncio.Task | None = None
+        self._metrics_at = 0.0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def ensure_groups(self) -> None:
+        for stream in self.streams:
+            for group in self.groups:
+                try:
+                    await self.redis.xgroup_create(stream, group, id="0", mkstream=True)
+                except ResponseError as e:
+                    if "BUSYGROUP" not in str(e):
+                        raise
+
+    async def drain_once(self) -> int:
+        async with shard_session(self.shard) as session:
+            locked = await session.scalar(
+                select(func.pg_try_advisory_xact_lock(RELAY_LOCK_KEY))
+            )
+            if not locked:
+                return 0
+            events = await OutboxEventDAO.lock_batch(session, self.batch_size)
+            if not events:
+                outbox_relay_lag_seconds.labels(database=self.database).set(0)
+                return 0
+
+            started = time.perf_counter()
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for event in events:
+                    pipe.xadd(
+                        event.stream,
+                        {
+                            "event_id": event.id,
+                            "type": event.event_type,
+                            "payload": event.payload,
+                            "created_at": event.created_at.isoformat(),
+                        },
+                        maxlen=self.stream_maxlen,
+                        approximate=True
+                    )
+                await pipe.execute()
+            await OutboxEventDAO.delete(
+                session, OutboxEventModel.id.in_([event.id for event in events])
+            )
+            await session.commit()
+
+        outbox_relay_batch_seconds.observe(time.perf_counter() - started)
+        outbox_relay_lag_seconds.labels(database=self.database).set(
+            (datetime.now(timezone.utc) - events[0].created_at).total_seconds()
+        )
+        for event in events:
+            outbox_events_published_total.labels(stream=event.stream).inc()
+        return len(events)
+
+    async def record_group_lag(self) -> None:
+        for stream in self.streams:
+            for info in await self.redis.xinfo_groups(stream):
+                # `lag` is reported by Redis 7+, None when it cannot be computed
+                if info.get("lag") is not None:
+                    outbox_consumer_group_lag.labels(
+                        stream=stream, group=info["name"]
+                    ).set(info["lag"])
+                outbox_consumer_group_pending.labels(
+                    stream=stream, group=info["name"]
+                ).set(info["pending"])
+
+    async def _run(self) -> None:
+        groups_ready = False
+        while True:
+            relayed = 0
+            try:
+                if not groups_ready:
+                    await self.ensure_groups()
+                    groups_ready = True
+                relayed = await self.drain_once()
+                if time.monotonic() - self._metrics_at >= self.metrics_interval:
+                    self._metrics_at = time.monotonic()
+                    await self.record_group_lag()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                outbox_relay_errors_total.inc()
+                logger.exception("outbox relay batch failed")
+            if relayed < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+
+outbox_relays = [
+    OutboxRelay(
+        redis_client,
+        streams=[OutboxService.FINANCE_STREAM, OutboxService.USERS_STREAM],
+        groups=settings.OUTBOX_CONSUMER_GROUPS,
+        batch_size=settings.OUTBOX_BATCH_SIZE,
+        poll_interval=settings.OUTBOX_POLL_INTERVAL_SECONDS,
+        stream_maxlen=settings.OUTBOX_STREAM_MAXLEN,
+        shard=shard
+    )
+    for shard in ([None] + all_shards() if shard_router.enabled else [None])
+]
@@ -0,0 +1,34 @@
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.outbox.dao import OutboxEventDAO
+from app.utils.responses import orjson_dumps
+
+
+class OutboxService:
+    FINANCE_STREAM = "events:finance"
+    USERS_STREAM = "events:users"
+
+    @staticmethod
+    def event(stream: str, event_type: str, payload: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "stream": stream,
+            "event_type": event_type,
+            "payload": orjson_dumps(payload).decode()
+        }
+
+    @staticmethod
+    async def emit(
+        session: AsyncSession,
+        stream: str,
+        event_type: str,
+        payload: dict[str, Any]
+    ) -> None:
+        """Queue an event in the caller's transaction; the relay publishes it after commit."""
+        await OutboxEventDAO.insert(session, [OutboxService.event(stream, event_type, payload)])
+
+    @staticmethod
+    async def emit_many(session: AsyncSession, events: list[dict[str, Any]]) -> None:
+        if events:
+            await OutboxEventDAO.insert(session, events)
@@ -0,0 +1,109 @@
+from datetime import datetime
+import uuid
+
+from sqlalchemy import Row, String, func, literal, select, tuple_, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.archive.dao import ArchivedExpenseDAO, ArchivedIncomeDAO
+from app.dao.base import BaseDAO
+from app.finance.models import ExpenseModel, IncomeModel
+from app.statements.models import StatementModel
+from app.sync.models import SyncTombstoneModel
+from app.utils.database.replicas import mark_written
+
+
+class StatementDAO(BaseDAO):
+    model = StatementModel
+
+    @classmethod
+    async def data_version(cls, session: AsyncSession, user_id: uuid.UUID) -> int:
+        """Highest change_version among the user's transactions, deletions included.
+
+        Archived rows count too: archiving writes no tombstone, so without them
+        the version would go back when the user's newest change is archived.
+        """
+        versions = [
+            select(func.max(model.change_version))
+            .where(model.user_id == user_id)
+            .scalar_subquery()
+            for model in (
+                IncomeModel, ExpenseModel, ArchivedIncomeDAO.model, ArchivedExpenseDAO.model,
+                SyncTombstoneModel
+            )
+        ]
+        return await session.scalar(
+            select(func.coalesce(func.greatest(*versions), 0))
+        )
+
+    @classmethod
+    async def add_or_get(
+        cls, session: AsyncSession, data: dict
+    ) -> tuple[StatementModel, bool]:
+        mark_written(session)
+        stmt = (
+            pg_insert(cls.model)
+            .values(id=uuid.uuid4(), **data)
+            .on_conflict_do_nothing(constraint="uq_statements_request")
+            .returning(cls.model)
+        )
+        statement = await session.scalar(stmt)
+        if statement is not None:
+            return statement, True
+        statement = await session.scalar(
+            select(cls.model).filter_by(
+                user_id=data["user_id"],
+                period=data["period"],
+                period_start=data["period_start"],
+                format=data["format"],
+                data_version=data["data_version"]
+            )
+        )
+        return statement, False
+
+    @classmethod
+    async def aggregate(
+        cls,
+        session: AsyncSession,
+        user_id: uuid.UUID,
+        start: datetime,
+        end: datetime,
+        include_archive: bool = False
+    ) -> list[Row]:
+        """Per month/currency/category lines plus per currency totals (month is NULL)."""
+        sources = (
+            ("income", ArchivedIncomeDAO.with_hot() if include_archive else IncomeModel.__table__),
+            ("expense", ArchivedExpenseDAO.with_hot() if include_archive else ExpenseModel.__table__)
+        )
+        movements = union_all(*[
+            select(
+                literal(kind, String).label("kind"),
+                func.date_trunc("month", source.c.created_at).label("month"),
+                source.c.currency_code,
+                source.c.category,
+                source.c.value
+            ).where(
+                source.c.user_id == user_id,
+                source.c.created_at >= start,
+                source.c.created_at < end
+            )
+            for kind, source in sources
+        ]).subquery()
+        m = movements.c
+        stmt = (
+            select(
+                m.kind,
+                m.month,
+                m.currency_code,
+                m.category,
+                func.count().label("transactions"),
+                func.sum(m.value).label("total")
+            )
+            .group_by(func.grouping_sets(
+                tuple_(m.kind, m.month, m.currency_code, m.category),
+                tuple_(m.kind, m.currency_code)
+            ))
+            .order_by(m.kind, m.currency_code, m.month.nulls_last(), m.category)
+        )
+        result = await session.execute(stmt)
+        return result.all()
@@ -0,0 +1,42 @@
+from datetime import date, datetime
+import uuid
+
+from app.utils.database.database import BaseUUID
+
+from sqlalchemy import TIMESTAMP, BigInteger, ForeignKey, String, Text, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+
+class StatementModel(BaseUUID):
+    """A statement job; `data_version` pins the rows it covers so reruns can be reused."""
+    __tablename__ = "statements"
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id", "period", "period_start", "format", "data_version",
+            name="uq_statements_request"
+        ),
+    )
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey('user.id', ondelete="CASCADE"), index=True
+    )
+    period: Mapped[str] = mapped_column(String(8))
+    period_start: Mapped[date]
+    format: Mapped[str] = mapped_column(String(8))
+    data_version: Mapped[int] = mapped_column(BigInteger)
+    status: Mapped[str] = mapped_column(String(16))
+    artifact: Mapped[str | None] = mapped_column(String(255))
+    error: Mapped[str | None] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True),
+        server_default=func.now()
+    )
+    completed_at: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True))
+    status_changed_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True),
+        server_default=func.now()
+    )
+
+    def __str__(self):
+        return f'{self.period} statement from {self.period_start}'
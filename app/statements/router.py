@@ -0,0 +1,49 @@
+import uuid
+
+from fastapi import APIRouter, Depends, status
+from fastapi.responses import FileResponse
+
+from app.auth.dependencies import get_current_active_user
+from app.auth.schemas import User
+from app.statements.schemas import Statement, StatementCreate
+from app.statements.service import StatementService
+from app.utils.rate_limit import RateLimiter
+
+
+statement_router = APIRouter(
+    prefix="/statements",
+    tags=["statements"]
+)
+
+
+@statement_router.post(
+    "",
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(RateLimiter("statements", capacity=10, period=60, by="user"))]
+)
+async def request_statement(
+    statement: StatementCreate,
+    current_user: User = Depends(get_current_active_user)
+) -> Statement:
+    return await StatementService.request_statement(current_user.id, statement)
+
+
+@statement_router.get("/{statement_id}")
+async def get_statement(
+    statement_id: uuid.UUID,
+    current_user: User = Depends(get_current_active_user)
+) -> Statement:
+    return await StatementService.get_statement(current_user.id, statement_id)
+
+
+@statement_router.get("/{statement_id}/download")
+async def download_statement(
+    statement_id: uuid.UUID,
+    current_user: User = Depends(get_current_active_user)
+) -> FileResponse:
+    statement, path = await StatementService.get_artifact(current_user.id, statement_id)
+    return FileResponse(
+        path,
+        media_type="application/gzip",
+        filename=f"statement-{statement.period_start:%Y-%m}.{statement.format}.gz"
+    )
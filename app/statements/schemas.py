@@ -0,0 +1,33 @@
+from datetime import date, datetime
+from typing import Literal
+import uuid
+
+from pydantic import BaseModel, Field, model_validator
+
+
+class StatementCreate(BaseModel):
+    period: Literal["month", "year"]
+    year: int = Field(ge=1970, le=9999, examples=[2026])
+    month: int | None = Field(None, ge=1, le=12, examples=[9])
+    format: Literal["csv", "json"] = "csv"
+
+    @model_validator(mode="after")
+    def check_month(self) -> "StatementCreate":
+        if (self.period == "month") != (self.month is not None):
+            raise ValueError("month is required for monthly statements only")
+        return self
+
+    @property
+    def period_start(self) -> date:
+        return date(self.year, self.month or 1, 1)
+
+
+class Statement(BaseModel):
+    id: uuid.UUID
+    period: str
+    period_start: date
+    format: str
+    status: str = Field(examples=["pending", "running", "ready", "failed"])
+    error: str | None = None
+    created_at: datetime
+    completed_at: datetime | None = None
@@ -0,0 +1,221 @@
+import asyncio
+import csv
+import gzip
+import io
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import Row, func
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.archive.service import ArchiveService
+from app.data.config import settings
+from app.tasks.celery import celery_app
+from app.utils.database.database import shard_router, user_session
+from app.utils.database.replicas import pin_to_primary
+from app.utils.exceptions import StatementNotFoundException, StatementNotReadyException
+from app.utils.responses import orjson_dumps
+from .dao import StatementDAO
+from .models import StatementModel
+from .schemas import StatementCreate
+from .storage import LocalArtifactStorage
+
+storage = LocalArtifactStorage(settings.STATEMENTS_DIR)
+
+CSV_COLUMNS = ["kind", "month", "currency_code", "category", "transactions", "total"]
+
+
+class StatementService:
+    PENDING = "pending"
+    RUNNING = "running"
+    READY = "ready"
+    FAILED = "failed"
+
+    @staticmethod
+    async def request_statement(
+        user_id: uuid.UUID,
+        request: StatementCreate
+    ) -> StatementModel:
+        async with user_session(user_id) as session:
+            pin_to_primary(session)
+            statement, enqueue = await StatementDAO.add_or_get(
+                session,
+                {
+                    "user_id": user_id,
+                    "period": request.period,
+                    "period_start": request.period_start,
+                    "format": request.format,
+                    "data_version": await StatementDAO.data_version(session, user_id),
+                    "status": StatementService.PENDING
+                }
+            )
+            if not enqueue and StatementService._needs_restart(statement):
+                restarted = await StatementDAO.update(
+                    session,
+                    StatementModel.id == statement.id,
+                    # of several concurrent requests only one restarts the job
+                    StatementModel.status == statement.status,
+                    StatementModel.status_changed_at == statement.status_changed_at,
+                    obj_in={
+                        "status": StatementService.PENDING,
+                        "error": None,
+                        "status_changed_at": func.now()
+                    }
+                )
+                if restarted:
+                    [statement] = restarted
+                    enqueue = True
+            await session.commit()
+        if enqueue:
+            build_statement.delay(str(statement.id), str(user_id))
+        return statement
+
+    @staticmethod
+    def _needs_restart(statement: StatementModel) -> bool:
+        if statement.status == StatementService.FAILED:
+            return True
+        if statement.status == StatementService.READY:
+            return not storage.exists(statement.artifact)
+        # a lost broker message or a worker that died mid-build leaves the job
+        # pending or running forever, and add_or_get would keep returning it
+        stale_before = datetime.now(timezone.utc) - timedelta(
+            seconds=settings.STATEMENT_STALE_AFTER_SECONDS
+        )
+        return statement.status_changed_at < stale_before
+
+    @staticmethod
+    async def get_statement(user_id: uuid.UUID, statement_id: uuid.UUID) -> StatementModel:
+        async with user_session(user_id) as session:
+            statement = await StatementDAO.find_one_or_none(
+                session, id=statement_id, user_id=user_id
+            )
+        if statement is None:
+            raise StatementNotFoundException
+        return statement
+
+    @staticmethod
+    async def get_artifact(user_id: uuid.UUID, statement_id: uuid.UUID):
+        statement = await StatementService.get_statement(user_id, statement_id)
+        if statement.status != StatementService.READY:
+            raise StatementNotReadyException
+        return statement, storage.path(statement.artifact)
+
+    @staticmethod
+    async def build(statement_id: uuid.UUID, user_id: uuid.UUID | None = None) -> None:
+        # celery runs each task in a fresh event loop, so pooled asyncpg
+        # connections from the app engine cannot be reused here
+        url = settings.DATABASE_URL
+        if shard_router.enabled:
+            # everything a statement reads lives on its owner's shard
+            control = create_async_engine(settings.DATABASE_URL, poolclass=NullPool)
+            try:
+                shard = await shard_router.shard_for(user_id, control)
+            finally:
+                await control.dispose()
+            url = settings.DATABASE_SHARD_URLS[shard]
+        engine = create_async_engine(url, poolclass=NullPool)
+        session_maker = async_sessionmaker(engine, expire_on_commit=False)
+        try:
+            async with session_maker() as session:
+                pin_to_primary(session)
+                statement = await StatementDAO.find_one_or_none(session, id=statement_id)
+                if statement is None or statement.status == StatementService.READY:
+                    return
+                await StatementDAO.update(
+                    session,
+                    StatementModel.id == statement_id,
+                    obj_in={"status": StatementService.RUNNING, "status_changed_at": func.now()}
+                )
+                await session.commit()
+
+            try:
+                start, end = StatementService._period_bounds(statement)
+                async with session_maker() as session:
+                    pin_to_primary(session)
+                    rows = await StatementDAO.aggregate(
+                        session,
+                        statement.user_id,
+                        start,
+                        end,
+                        include_archive=await ArchiveService.needs_archive(
+                            session, statement.user_id, start
+                        )
+                    )
+                name = f"{statement.id}.{statement.format}.gz"
+                storage.save(name, StatementService._render(statement, start, end, rows))
+                update = {
+                    "status": StatementService.READY,
+                    "artifact": name,
+                    "completed_at": datetime.now(timezone.utc)
+                }
+            except Exception as e:
+                update = {"status": StatementService.FAILED, "error": str(e)[:1000]}
+                raise
+            finally:
+                async with session_maker() as session:
+                    await StatementDAO.update(
+                        session,
+                        StatementModel.id == statement_id,
+                        obj_in={**update, "status_changed_at": func.now()}
+                    )
+                    await session.commit()
+        finally:
+            await engine.dispose()
+
+    @staticmethod
+    def _period_bounds(statement: StatementModel) -> tuple[datetime, datetime]:
+        start = statement.period_start
+        if statement.period == "year":
+            end = date(start.year + 1, 1, 1)
+        else:
+            end = date(start.year + start.month // 12, start.month % 12 + 1, 1)
+        return (
+            datetime(start.year, start.month, start.day, tzinfo=timezone.utc),
+            datetime(end.year, end.month, end.day, tzinfo=timezone.utc)
+        )
+
+    @staticmethod
+    def _render(
+        statement: StatementModel,
+        start: datetime,
+        end: datetime,
+        rows: list[Row]
+    ) -> bytes:
+        lines = []
+        totals = []
+        for row in rows:
+            line: dict[str, Any] = row._asdict()
+            if line["month"] is None:
+                del line["month"], line["category"]
+                totals.append(line)
+            else:
+                line["month"] = line["month"].strftime("%Y-%m")
+                lines.append(line)
+
+        if statement.format == "json":
+            body = orjson_dumps({
+                "user_id": statement.user_id,
+                "period": statement.period,
+                "period_start": start,
+                "period_end": end,
+                "data_version": statement.data_version,
+                "lines": lines,
+                "totals": totals
+            })
+        else:
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS)
+            writer.writeheader()
+            writer.writerows(lines)
+            writer.writerows({**total, "month": "total"} for total in totals)
+            body = buffer.getvalue().encode()
+        return gzip.compress(body)
+
+
+@celery_app.task(acks_late=True)
+def build_statement(statement_id: str, user_id: str | None = None):
+    asyncio.run(StatementService.build(
+        uuid.UUID(statement_id), uuid.UUID(user_id) if user_id else None
+    ))
@@ -0,0 +1,22 @@
+import os
+from pathlib import Path
+
+
+class LocalArtifactStorage:
+    """Stores statement artifacts on a (shared) local volume."""
+
+    def __init__(self, root: str) -> None:
+        self.root = Path(root)
+
+    def save(self, name: str, data: bytes) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / f".{name}.tmp"
+        tmp.write_bytes(data)
+        # readers never see a half-written file
+        os.replace(tmp, self.root / name)
+
+    def path(self, name: str) -> Path:
+        return self.root / name
+
+    def exists(self, name: str) -> bool:
+        return self.path(name).is_file()
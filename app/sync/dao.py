@@ -0,0 +1,56 @@
+from datetime import datetime
+
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.dao.base import BaseDAO
+from app.sync.models import SyncHorizonModel, SyncTombstoneModel
+from app.utils.database.replicas import mark_written
+
+
+class SyncTombstoneDAO(BaseDAO):
+    model = SyncTombstoneModel
+
+    @classmethod
+    async def purge_older_than(
+        cls, session: AsyncSession, cutoff: datetime, limit: int
+    ) -> int:
+        """Delete up to `limit` tombstones written before `cutoff`, moving the horizon past them."""
+        t = cls.model
+        batch = (
+            select(t.change_version)
+            .where(t.deleted_at < cutoff)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        mark_written(session)
+        result = await session.execute(
+            delete(t)
+            .where(t.change_version.in_(batch.scalar_subquery()))
+            .returning(t.change_xid, t.change_version)
+        )
+        purged = result.all()
+        if purged:
+            await SyncHorizonDAO.advance(session, max(purged))
+        return len(purged)
+
+
+class SyncHorizonDAO(BaseDAO):
+    model = SyncHorizonModel
+
+    @classmethod
+    async def advance(cls, session: AsyncSession, position: tuple[int, int]) -> None:
+        h = cls.model
+        stmt = pg_insert(h).values(id=1, change_xid=position[0], change_version=position[1])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[h.id],
+            set_={
+                "change_xid": stmt.excluded.change_xid,
+                "change_version": stmt.excluded.change_version
+            },
+            where=tuple_(h.change_xid, h.change_version)
+            < tuple_(stmt.excluded.change_xid, stmt.excluded.change_version)
+        )
+        mark_written(session)
+        await session.execute(stmt)
@@ -0,0 +1,46 @@
+from datetime import datetime
+import uuid
+
+from app.utils.database.database import Base
+
+from sqlalchemy import TIMESTAMP, BigInteger, CheckConstraint, Index, SmallInteger, String, text
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+
+class SyncTombstoneModel(Base):
+    """Written by the `track_delete` trigger when a synced row is deleted."""
+    __tablename__ = "sync_tombstones"
+    __table_args__ = (
+        Index(
+            "ix_sync_tombstones_user_id_change_xid", "user_id", "change_xid", "change_version"
+        ),
+    )
+
+    change_version: Mapped[int] = mapped_column(
+        BigInteger,
+        primary_key=True,
+        server_default=text("nextval('change_version_seq')")
+    )
+    change_xid: Mapped[int] = mapped_column(
+        BigInteger,
+        server_default=text("pg_current_xact_id()::text::bigint")
+    )
+    table_name: Mapped[str] = mapped_column(String(32))
+    row_id: Mapped[str]
+    user_id: Mapped[uuid.UUID]
+    deleted_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True),
+        server_default=func.now(),
+        index=True
+    )
+
+
+class SyncHorizonModel(Base):
+    """Position of the newest purged tombstone; older cursors may have missed deletions."""
+    __tablename__ = "sync_horizon"
+    __table_args__ = (CheckConstraint("id = 1", name="ck_sync_horizon_single_row"),)
+
+    id: Mapped[int] = mapped_column(SmallInteger, primary_key=True, autoincrement=False)
+    change_xid: Mapped[int] = mapped_column(BigInteger)
+    change_version: Mapped[int] = mapped_column(BigInteger)
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends, Query, Response
+
+from app.auth.dependencies import get_current_active_user
+from app.auth.schemas import User
+from app.sync.schemas import SyncChanges
+from app.sync.service import SyncService
+from app.utils.responses import ORJSONResponse
+
+
+sync_router = APIRouter(
+    prefix="/sync",
+    tags=["sync"]
+)
+
+
+@sync_router.get("", response_model=SyncChanges)
+async def get_changes(
+    cursor: str = Query("0.0", pattern=r"^\d+\.\d+$"),
+    limit: int = Query(500, ge=1, le=1000),
+    current_user: User = Depends(get_current_active_user)
+) -> Response:
+    return ORJSONResponse(
+        await SyncService.get_changes(
+            user_id=current_user.id,
+            cursor=cursor,
+            limit=limit
+        )
+    )
@@ -0,0 +1,21 @@
+from pydantic import BaseModel, Field
+
+from app.auth.schemas import Profile, User
+from app.finance.schemas import FinanceItem
+
+
+class Tombstone(BaseModel):
+    table: str = Field(examples=['expenses'])
+    id: str
+
+
+class SyncChanges(BaseModel):
+    cursor: str = Field(examples=["0.0"])
+    has_more: bool
+    user: User | None = None
+    profile: Profile | None = None
+    income_categories: list[str] | None = None
+    expense_categories: list[str] | None = None
+    incomes: list[FinanceItem] = []
+    expenses: list[FinanceItem] = []
+    deleted: list[Tombstone] = []
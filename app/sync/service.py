@@ -0,0 +1,163 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import BigInteger, Text, cast, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.auth.dao import ProfileDAO, UserDAO
+from app.auth.schemas import Profile, User
+from app.finance.dao import ExpenseDAO, ExpenseTypeDAO, IncomeDAO, IncomeTypeDAO
+from app.data.config import settings
+from app.finance.schemas import FinanceItem
+from app.tasks.celery import celery_app
+from app.utils.database.database import shard_router, user_session
+from app.utils.database.replicas import pin_to_primary
+from app.utils.exceptions import SyncCursorExpiredException
+from app.utils.responses import orm_to_dict
+from .dao import SyncHorizonDAO, SyncTombstoneDAO
+
+logger = logging.getLogger(__name__)
+
+TOMBSTONE_TABLES = {
+    "incomes": "incomes",
+    "expencies": "expenses",
+    "profiles": "profile",
+}
+
+# every xid below the snapshot's xmin has committed or aborted
+SNAPSHOT_XMIN = select(
+    cast(cast(func.pg_snapshot_xmin(func.pg_current_snapshot()), Text), BigInteger)
+)
+HORIZON_QUERY = select(SyncHorizonDAO.model.change_xid, SyncHorizonDAO.model.change_version)
+
+
+class SyncService:
+    @staticmethod
+    async def get_changes(
+        user_id: uuid.UUID,
+        cursor: str,
+        limit: int
+    ) -> dict[str, Any]:
+        """Changes after `cursor`, an opaque "<change_xid>.<change_version>" position.
+
+        All sources are read from one REPEATABLE READ snapshot and paged on
+        (change_xid, change_version) below that snapshot's xmin. A sequence value
+        alone cannot be a cursor: a transaction holding a lower version may still
+        be open when a higher one is handed out.
+
+        Tombstones are purged after SYNC_TOMBSTONE_RETENTION_DAYS; a cursor from
+        before the newest purged one may have missed deletions and is refused,
+        the client has to sync again from "0.0".
+        """
+        position = tuple(int(part) for part in cursor.split("."))
+        sources = {
+            "user": (UserDAO, {"id": user_id}),
+            "profile": (ProfileDAO, {"user_id": user_id}),
+            "income_categories": (IncomeTypeDAO, {"user_id": user_id}),
+            "expense_categories": (ExpenseTypeDAO, {"user_id": user_id}),
+            "incomes": (IncomeDAO, {"user_id": user_id}),
+            "expenses": (ExpenseDAO, {"user_id": user_id}),
+            "deleted": (SyncTombstoneDAO, {"user_id": user_id}),
+        }
+        changes = []
+        has_more = False
+        db_user = None
+        async with user_session(user_id) as session:
+            # one snapshot means one connection, so no replica reads either
+            pin_to_primary(session)
+            connection = await session.connection(
+                bind_arguments={"mapper": IncomeDAO.model.__mapper__},
+                execution_options={"isolation_level": "REPEATABLE READ"}
+            )
+            watermark = await connection.scalar(SNAPSHOT_XMIN)
+            horizon = (await connection.execute(HORIZON_QUERY)).first()
+            if horizon is not None and position != (0, 0) and position < tuple(horizon):
+                raise SyncCursorExpiredException
+            if shard_router.enabled:
+                # the user row is versioned by the control database's sequence,
+                # which cannot share a cursor with the shard's; send it every time
+                del sources["user"]
+                db_user = await UserDAO.find_one_by(session, "id", user_id)
+            for name, (dao, filter_by) in sources.items():
+                rows = await dao.find_changed_since(
+                    session, position, watermark, limit=limit, **filter_by
+                )
+                has_more = has_more or len(rows) == limit
+                changes.extend(
+                    ((row.change_xid, row.change_version), name, row) for row in rows
+                )
+
+        changes.sort(key=lambda change: change[0])
+        if has_more:
+            # a source that hit the limit may have more rows right after its last
+            # one, so only the first `limit` changes overall are safe to hand out
+            changes = changes[:limit]
+        if changes:
+            cursor = "%d.%d" % changes[-1][0]
+        response = SyncService._build_response(cursor, has_more, changes)
+        if db_user is not None:
+            response["user"] = orm_to_dict(User, db_user)
+        return response
+
+    @staticmethod
+    def _build_response(
+        cursor: str,
+        has_more: bool,
+        changes: list[tuple[tuple[int, int], str, Any]]
+    ) -> dict[str, Any]:
+        response = {
+            "cursor": cursor,
+            "has_more": has_more,
+            "incomes": [],
+            "expenses": [],
+            "deleted": []
+        }
+        for _, name, row in changes:
+            if name == "user":
+                response["user"] = orm_to_dict(User, row)
+            elif name == "profile":
+                response["profile"] = orm_to_dict(Profile, row)
+            elif name in ("income_categories", "expense_categories"):
+                response[name] = row.categories
+            elif name == "deleted":
+                response["deleted"].append(
+                    {"table": TOMBSTONE_TABLES[row.table_name], "id": row.row_id}
+                )
+            else:
+                response[name].append(orm_to_dict(FinanceItem, row))
+        return response
+
+    @staticmethod
+    async def purge_tombstones(cutoff: datetime | None = None) -> int:
+        cutoff = cutoff or datetime.now(timezone.utc) - timedelta(
+            days=settings.SYNC_TOMBSTONE_RETENTION_DAYS
+        )
+        purged = 0
+        # celery runs each task in a fresh event loop, see StatementService.build;
+        # tombstones written before sharding stay on the control database
+        for url in [settings.DATABASE_URL, *settings.DATABASE_SHARD_URLS]:
+            engine = create_async_engine(url, poolclass=NullPool)
+            session_maker = async_sessionmaker(engine, expire_on_commit=False)
+            try:
+                for _ in range(settings.SYNC_PURGE_MAX_BATCHES):
+                    async with session_maker() as session:
+                        count = await SyncTombstoneDAO.purge_older_than(
+                            session, cutoff, settings.SYNC_PURGE_BATCH_SIZE
+                        )
+                        await session.commit()
+                    purged += count
+                    if count < settings.SYNC_PURGE_BATCH_SIZE:
+                        break
+            finally:
+                await engine.dispose()
+        logger.info("purged sync tombstones", extra={"purged": purged, "cutoff": cutoff.isoformat()})
+        return purged
+
+
+@celery_app.task
+def purge_sync_tombstones():
+    return asyncio.run(SyncService.purge_tombstones())
@@ -1,8 +1,53 @@
-from celery import Celery
+from celery import Celery, signals
+from celery.schedules import crontab
 from app.data.config import settings
+from app.logger import correlation_id, new_correlation_id, setup_logging
 
 celery_app = Celery(
     'tasks', 
     broker=settings.REDIS_URL,
-    include=["app.auth.service"]
+    include=[
+        "app.auth.service", "app.statements.service", "app.archive.service",
+        "app.balances.service", "app.sync.service"
+    ]
 )
+# celery talks to redis through kombu, so it cannot share the app's asyncio
+# pool; cap its connections instead of letting each worker grow unbounded
+celery_app.conf.update(
+    broker_pool_limit=settings.REDIS_CELERY_MAX_CONNECTIONS,
+    redis_max_connections=settings.REDIS_CELERY_MAX_CONNECTIONS
+)
+celery_app.conf.beat_schedule = {
+    "archive-transactions": {
+        "task": "app.archive.service.archive_transactions",
+        "schedule": crontab(hour=settings.ARCHIVE_HOUR_UTC, minute=0),
+    },
+    "reconcile-balances": {
+        "task": "app.balances.service.reconcile_balances",
+        "schedule": crontab(hour=settings.BALANCE_RECONCILE_HOUR_UTC, minute=0),
+    },
+    "purge-sync-tombstones": {
+        "task": "app.sync.service.purge_sync_tombstones",
+        "schedule": crontab(hour=settings.SYNC_PURGE_HOUR_UTC, minute=0),
+    },
+}
+
+
+@signals.setup_logging.connect
+def configure_worker_logging(**kwargs):
+    # connecting this signal stops celery from installing its own handlers
+    setup_logging()
+
+
+@signals.before_task_publish.connect
+def attach_correlation_id(headers=None, **kwargs):
+    if headers is not None:
+        headers.setdefault("correlation_id", correlation_id.get() or new_correlation_id())
+
+
+@signals.task_prerun.connect
+def bind_correlation_id(task=None, **kwargs):
+    request_id = getattr(task.request, "correlation_id", None)
+    if request_id is None:
+        request_id = (task.request.headers or {}).get("correlation_id")
+    correlation_id.set(request_id or new_correlation_id())
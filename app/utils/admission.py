@@ -0,0 +1,69 @@
+from prometheus_client import Counter, Gauge
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.data.config import settings
+from app.utils.loop_monitor import loop_monitor
+from app.utils.responses import ORJSONResponse
+from app.utils.timing import pool_pressure
+
+http_requests_in_flight = Gauge(
+    "http_requests_in_flight", "Requests currently being handled by this worker"
+)
+admission_shed_total = Counter(
+    "admission_shed_total", "Requests rejected by admission control", ["reason"]
+)
+
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def overload_reason(in_flight: int) -> str | None:
+    if in_flight > settings.ADMISSION_MAX_IN_FLIGHT:
+        return "in_flight"
+    if pool_pressure.waiting > settings.ADMISSION_MAX_POOL_WAITERS:
+        return "pool_waiters"
+    if pool_pressure.recent_wait * 1000 > settings.ADMISSION_MAX_POOL_WAIT_MS:
+        return "pool_wait"
+    if loop_monitor.lag * 1000 > settings.ADMISSION_MAX_LOOP_LAG_MS:
+        return "loop_lag"
+    return None
+
+
+class AdmissionControlMiddleware:
+    """Sheds low-priority reads with 503 while the worker is saturated.
+
+    Writes and ADMISSION_PROTECTED_PATHS (token refresh, metrics) are always
+    admitted so sessions survive and the overload stays observable.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.in_flight = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if (
+            settings.ADMISSION_CONTROL_ENABLED
+            and scope["method"] in READ_METHODS
+            and scope["path"] not in settings.ADMISSION_PROTECTED_PATHS
+        ):
+            reason = overload_reason(self.in_flight + 1)
+            if reason is not None:
+                admission_shed_total.labels(reason=reason).inc()
+                response = ORJSONResponse(
+                    {"detail": "Service is overloaded, retry later"},
+                    status_code=503,
+                    headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER_SECONDS)}
+                )
+                await response(scope, receive, send)
+                return
+
+        self.in_flight += 1
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+            http_requests_in_flight.dec()
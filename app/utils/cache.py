@@ -0,0 +1,362 @@
+import asyncio
+import functools
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Iterable, NamedTuple
+
+import orjson
+from prometheus_client import Counter
+from pydantic import TypeAdapter
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+from app.data.config import settings
+from app.utils.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+cache_requests_total = Counter(
+    "cache_requests_total", "Service cache lookups per tier and outcome", ["tier", "result"]
+)
+cache_computations_total = Counter(
+    "cache_computations_total", "Cache fills per trigger", ["trigger"]
+)
+
+TAG_PREFIX = "cache:tag:"
+LOCK_SUFFIX = ":lock"
+
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class CacheEntry(NamedTuple):
+    value: Any
+    fresh_until: float
+    expires_at: float
+    tags: tuple[str, ...]
+
+
+class LocalLRU:
+    """Per-worker LRU of decoded values, indexed by tag for invalidation."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._tags: dict[str, set[str]] = {}
+
+    def get(self, key: str) -> CacheEntry | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.time():
+            self.pop(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        self.pop(key)
+        self._entries[key] = entry
+        for tag in entry.tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.maxsize:
+            self.pop(next(iter(self._entries)))
+
+    def pop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        for tag in tags:
+            for key in list(self._tags.get(tag, ())):
+                self.pop(key)
+
+
+class TieredCache:
+    """In-process LRU in front of Redis, with tag invalidation fanned out over pub/sub.
+
+    Local copies live at most `local_ttl` seconds, which bounds staleness in a
+    worker that missed an invalidation message while reconnecting. Misses are
+    single-flighted per process and, with `redis_lock`, across processes; an
+    entry past its fresh period but inside `stale_ttl` is served while one
+    caller refreshes it in the background.
+    """
+
+    def __init__(
+        self,
+        redis: aioredis.Redis,
+        local_maxsize: int = 1024,
+        local_ttl: float = 30.0,
+        channel: str = "cache:invalidate",
+        redis_lock: bool = False,
+        lock_timeout: float = 2.0
+    ) -> None:
+        self.redis = redis
+        self.local = LocalLRU(local_maxsize)
+        self.local_ttl = local_ttl
+        self.channel = channel
+        self.redis_lock = redis_lock
+        self.lock_timeout = lock_timeout
+        self._release_lock = redis.register_script(RELEASE_LOCK_SCRIPT)
+        self._inflight: dict[str, asyncio.Task] = {}
+        # per in-flight key, starting at 0 and bumped when one of its tags is
+        # invalidated, so a fill that read before a write does not store after it
+        self._generations: dict[str, int] = {}
+        self._inflight_tags: dict[str, tuple[str, ...]] = {}
+        self._listener: asyncio.Task | None = None
+
+    async def get_or_compute(
+        self,
+        key: str,
+        adapter: TypeAdapter,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: int,
+        stale_ttl: int = 0,
+        tags: tuple[str, ...] = ()
+    ) -> Any:
+        entry = await self._lookup(key, adapter, tags)
+        if entry is not None:
+            if entry.fresh_until <= time.time() and key not in self._inflight:
+                self._start(key, adapter, compute, ttl, stale_ttl, tags, refresh=True)
+            return entry.value
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._start(key, adapter, compute, ttl, stale_ttl, tags, refresh=False)
+        # a cancelled caller must not cancel the fill its peers are waiting on
+        return await asyncio.shield(task)
+
+    def _start(self, key, adapter, compute, ttl, stale_ttl, tags, refresh: bool) -> asyncio.Task:
+        self._generations[key] = 0
+        self._inflight_tags[key] = tags
+        task = asyncio.create_task(
+            self._fill(key, adapter, compute, ttl, stale_ttl, tags, refresh)
+        )
+        self._inflight[key] = task
+
+        def done(task: asyncio.Task) -> None:
+            self._inflight.pop(key, None)
+            self._generations.pop(key, None)
+            self._inflight_tags.pop(key, None)
+            if not task.cancelled() and task.exception() is not None and refresh:
+                logger.warning(
+                    "cache refresh failed", extra={"key": key}, exc_info=task.exception()
+                )
+
+        task.add_done_callback(done)
+        return task
+
+    async def _fill(self, key, adapter, compute, ttl, stale_ttl, tags, refresh: bool) -> Any:
+        token = None
+        if self.redis_lock:
+            token = uuid.uuid4().hex
+            try:
+                acquired = await self.redis.set(
+                    key + LOCK_SUFFIX, token, nx=True, px=int(self.lock_timeout * 1000)
+                )
+            except RedisError:
+                acquired, token = True, None
+            if not acquired:
+                token = None
+                if refresh:
+                    # another process is already refreshing this entry
+                    return None
+                entry = await self._wait_for_peer(key, adapter, tags)
+                if entry is not None:
+                    return entry.value
+        try:
+            cache_computations_total.labels(trigger="refresh" if refresh else "miss").inc()
+            value = adapter.validate_python(await compute(), from_attributes=True)
+            # invalidated since the fill started: the value may predate the write
+            if not self._generations.get(key):
+                await self._store(key, value, adapter, ttl, stale_ttl, tags)
+            return value
+        finally:
+            if token is not None:
+                try:
+                    await self._release_lock(keys=[key + LOCK_SUFFIX], args=[token])
+                except RedisError:
+                    pass
+
+    async def _wait_for_peer(self, key, adapter, tags) -> CacheEntry | None:
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            entry = await self._lookup(key, adapter, tags, count=False)
+            if entry is not None:
+                return entry
+        return None
+
+    async def _lookup(
+        self, key: str, adapter: TypeAdapter, tags: tuple[str, ...], count: bool = True
+    ) -> CacheEntry | None:
+        entry = self.local.get(key)
+        if count:
+            cache_requests_total.labels(tier="local", result="miss" if entry is None else "hit").inc()
+        if entry is not None:
+            return entry
+        try:
+            raw = await self.redis.get(key)
+        except RedisError:
+            logger.warning("cache read failed", extra={"key": key}, exc_info=True)
+            return None
+        if count:
+            cache_requests_total.labels(tier="redis", result="miss" if raw is None else "hit").inc()
+        if raw is None:
+            return None
+        try:
+            fresh_until, expires_at, payload = raw.split("|", 2)
+            entry = CacheEntry(
+                adapter.validate_json(payload), float(fresh_until), float(expires_at), tags
+            )
+        except ValueError:
+            # written in an older format or for another schema: recompute it
+            logger.warning("cache entry unreadable", extra={"key": key})
+            return None
+        self.local.set(key, entry._replace(
+            expires_at=min(entry.expires_at, time.time() + self.local_ttl)
+        ))
+        return entry
+
+    async def _store(
+        self,
+        key: str,
+        value: Any,
+        adapter: TypeAdapter,
+        ttl: int,
+        stale_ttl: int,
+        tags: tuple[str, ...]
+    ) -> None:
+        now = time.time()
+        fresh_until, expires_at = now + ttl, now + ttl + stale_ttl
+        self.local.set(key, CacheEntry(
+            value, fresh_until, min(expires_at, now + self.local_ttl), tags
+        ))
+        payload = f"{fresh_until}|{expires_at}|{adapter.dump_json(value).decode()}"
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.set(key, payload, ex=ttl + stale_ttl)
+                for tag in tags:
+                    pipe.sadd(TAG_PREFIX + tag, key)
+                    pipe.expire(TAG_PREFIX + tag, ttl + stale_ttl, gt=True)
+                    pipe.expire(TAG_PREFIX + tag, ttl + stale_ttl, nx=True)
+                await pipe.execute()
+        except RedisError:
+            logger.warning("cache write failed", extra={"key": key}, exc_info=True)
+
+    async def invalidate_tags(self, *tags: str) -> None:
+        if not tags:
+            return
+        self._invalidate_local(tags)
+        tag_keys = [TAG_PREFIX + tag for tag in tags]
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for tag_key in tag_keys:
+                    pipe.smembers(tag_key)
+                members = await pipe.execute()
+            keys = [key for keys in members for key in keys]
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.unlink(*keys, *tag_keys)
+                pipe.publish(self.channel, orjson.dumps(tags))
+                await pipe.execute()
+        except RedisError:
+            # other workers keep their local copy until it expires
+            logger.warning("cache invalidation failed", extra={"tags": tags}, exc_info=True)
+
+    def start(self) -> None:
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is None:
+            return
+        self._listener.cancel()
+        try:
+            await self._listener
+        except asyncio.CancelledError:
+            pass
+        self._listener = None
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with self.redis.pubsub(ignore_subscribe_messages=True) as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    async for message in pubsub.listen():
+                        self._invalidate_local(orjson.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("cache invalidation listener failed", exc_info=True)
+                # messages were lost while disconnected
+                self.local = LocalLRU(self.local.maxsize)
+                for key in self._generations:
+                    self._generations[key] += 1
+                await asyncio.sleep(1)
+
+    def _invalidate_local(self, tags: Iterable[str]) -> None:
+        tags = set(tags)
+        self.local.invalidate(tags)
+        for key, task_tags in self._inflight_tags.items():
+            if not tags.isdisjoint(task_tags):
+                self._generations[key] += 1
+
+
+service_cache = TieredCache(
+    redis_client,
+    local_maxsize=settings.CACHE_LOCAL_MAXSIZE,
+    local_ttl=settings.CACHE_LOCAL_TTL_SECONDS,
+    channel=settings.CACHE_INVALIDATION_CHANNEL,
+    redis_lock=settings.CACHE_SINGLE_FLIGHT_REDIS_LOCK,
+    lock_timeout=settings.CACHE_LOCK_TIMEOUT_MS / 1000
+)
+
+
+def cached(
+    schema: Any,
+    ttl: int,
+    tags: Callable[..., Iterable[str]] | None = None,
+    stale_ttl: int = 0
+) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+    """Cache a service coroutine's result, validated and stored as `schema`.
+
+    `tags` receives the call's arguments and names the tags whose
+    invalidation drops this entry. Arguments must have a stable str().
+    For `stale_ttl` seconds after `ttl` the old value is still served
+    while it is recomputed in the background.
+    """
+    adapter = TypeAdapter(schema)
+
+    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        prefix = f"cache:{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = ":".join(
+                [prefix, *map(str, args), *(f"{k}={v}" for k, v in sorted(kwargs.items()))]
+            )
+            return await service_cache.get_or_compute(
+                key,
+                adapter,
+                functools.partial(func, *args, **kwargs),
+                ttl,
+                stale_ttl,
+                tuple(tags(*args, **kwargs)) if tags else ()
+            )
+
+        return wrapper
+
+    return decorator
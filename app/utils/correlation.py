@@ -0,0 +1,46 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.logger import correlation_id, new_correlation_id
+
+CORRELATION_HEADER = "X-Request-ID"
+
+
+def _valid(value: str | None) -> bool:
+    return bool(value) and len(value) <= 64 and value.isascii() and value.isprintable()
+
+
+class CorrelationIdMiddleware:
+    """Binds the caller's X-Request-ID (or a fresh one) to the request and echoes it back."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        header = CORRELATION_HEADER.lower().encode()
+        value = next(
+            (v.decode("latin-1") for k, v in scope["headers"] if k == header), None
+        )
+        request_id = value if _valid(value) else new_correlation_id()
+        token = correlation_id.set(request_id)
+
+        async def send_with_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[CORRELATION_HEADER] = request_id
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            correlation_id.reset(token)
+
+
+def sentry_before_send(event, hint):
+    request_id = correlation_id.get()
+    if request_id:
+        event.setdefault("tags", {})["correlation_id"] = request_id
+    return event
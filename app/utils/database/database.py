@@ -1,12 +1,18 @@
-from typing import AsyncGenerator
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, AsyncIterator
 import uuid
 
 from sqlalchemy import UUID
 
 from app.data.config import settings
+from app.utils.database.replicas import Replica, ReplicaRouter, instrument_engine
+from app.utils.database.shards import (
+    SHARD_LOCAL_TABLES, SHARDED_TABLES, ShardNotSelectedError, ShardRouter, touched_tables
+)
+from app.utils.timing import TimedAsyncAdaptedQueuePool, instrument_sql_timing
 from sqlalchemy.orm import Mapped, mapped_column
 
-from sqlalchemy.orm import DeclarativeBase 
+from sqlalchemy.orm import DeclarativeBase, Session
 from sqlalchemy.ext.asyncio import (
     AsyncSession, 
     async_sessionmaker, 
@@ -14,8 +20,88 @@ from sqlalchemy.ext.asyncio import (
 )
 
 
-engine = create_async_engine(settings.DATABASE_URL)
-async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
+engine = create_async_engine(settings.DATABASE_URL, poolclass=TimedAsyncAdaptedQueuePool)
+instrument_engine(engine, "primary")
+instrument_sql_timing(engine)
+
+shard_router = ShardRouter(
+    [
+        create_async_engine(url, poolclass=TimedAsyncAdaptedQueuePool)
+        for url in settings.DATABASE_SHARD_URLS
+    ],
+    control=engine
+)
+for i, shard_engine in enumerate(shard_router.engines):
+    instrument_engine(shard_engine, f"shard-{i}")
+    instrument_sql_timing(shard_engine)
+
+
+class RoutingSession(Session):
+    """Sends statements on user-owned tables to the shard in `info["shard"]`.
+
+    Everything else, including the `user` and `currencies` tables, stays on
+    the control database the session is bound to.
+    """
+
+    def get_bind(self, mapper=None, *, clause=None, bind=None, **kw):
+        if bind is None and shard_router.enabled:
+            tables = touched_tables(mapper, clause)
+            shard = self.info.get("shard")
+            if tables & SHARDED_TABLES and shard is None:
+                raise ShardNotSelectedError(
+                    f"{sorted(tables & SHARDED_TABLES)} need a session from user_session()"
+                )
+            if shard is not None and tables & (SHARDED_TABLES | SHARD_LOCAL_TABLES):
+                return shard_router.engines[shard].sync_engine
+        return super().get_bind(mapper, clause=clause, bind=bind, **kw)
+
+
+async_session_maker = async_sessionmaker(
+    engine, expire_on_commit=False, sync_session_class=RoutingSession
+)
+
+
+@asynccontextmanager
+async def user_session(user_id: uuid.UUID) -> AsyncIterator[AsyncSession]:
+    """A session whose user-owned tables resolve to `user_id`'s shard."""
+    async with placed_session(await shard_router.shard_for(user_id)) as session:
+        yield session
+
+
+def placed_session(shard: int | None) -> AsyncSession:
+    """Like `user_session` for a known shard, e.g. one picked by `ShardRouter.place`."""
+    return async_session_maker(info={"shard": shard})
+
+
+def shard_session(shard: int | None) -> AsyncSession:
+    """A session pinned to one database: a shard, or the control one for None.
+
+    Unlike `user_session`, statements without a mapped table (advisory locks,
+    raw SQL) run there too, which is what per-database maintenance needs.
+    """
+    if shard is None:
+        return async_session_maker()
+    return async_session_maker(bind=shard_router.engines[shard], info={"shard": shard})
+
+
+def all_shards() -> list[int | None]:
+    """Databases holding user-owned tables: every shard, or just the control one."""
+    return list(range(len(shard_router.engines))) or [None]
+
+replica_router = ReplicaRouter(
+    [
+        Replica(
+            create_async_engine(url, poolclass=TimedAsyncAdaptedQueuePool),
+            f"replica-{i}"
+        )
+        for i, url in enumerate(settings.DATABASE_REPLICA_URLS)
+    ],
+    max_lag=settings.DB_REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.DB_REPLICA_CHECK_INTERVAL_SECONDS
+)
+for replica in replica_router.replicas:
+    instrument_engine(replica.engine, replica.name)
+    instrument_sql_timing(replica.engine)
 
 class Base(DeclarativeBase):
     pass
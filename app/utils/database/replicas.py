@@ -0,0 +1,119 @@
+import asyncio
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from prometheus_client import Counter, Gauge
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+db_statements_total = Counter(
+    "db_statements_total", "SQL statements executed per engine", ["engine"]
+)
+db_replica_lag_seconds = Gauge(
+    "db_replica_lag_seconds", "Replication lag reported by the replica", ["engine"]
+)
+db_replica_fallbacks_total = Counter(
+    "db_replica_fallbacks_total", "Reads sent to the primary because no replica was healthy"
+)
+
+REPLICA_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE extract(epoch FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+# set by `read_from_primary`, for reads that open their own sessions
+_primary_reads: ContextVar[bool] = ContextVar("primary_reads", default=False)
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    labeled = db_statements_total.labels(engine=name)
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def count_statement(*args) -> None:
+        labeled.inc()
+
+
+class Replica:
+    def __init__(self, engine: AsyncEngine, name: str) -> None:
+        self.engine = engine
+        self.name = name
+        self.lag: float | None = None
+        self.checked_at = 0.0
+        self._check: asyncio.Task | None = None
+
+    async def refresh_lag(self) -> None:
+        try:
+            async with self.engine.connect() as connection:
+                lag = await connection.scalar(REPLICA_LAG_QUERY)
+            self.lag = float(lag) if lag is not None else None
+        except Exception:
+            self.lag = None
+        self.checked_at = time.monotonic()
+        db_replica_lag_seconds.labels(engine=self.name).set(
+            self.lag if self.lag is not None else float("nan")
+        )
+
+
+class ReplicaRouter:
+    """Picks a healthy replica for reads, falling back to the primary.
+
+    A session is kept on the primary once it has written (see `mark_written`)
+    or was pinned with `pin_to_primary`, so it always reads its own writes.
+    Every session used inside `read_from_primary` stays there too.
+    """
+
+    def __init__(
+        self,
+        replicas: list[Replica],
+        max_lag: float,
+        check_interval: float
+    ) -> None:
+        self.replicas = replicas
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._cycle = itertools.cycle(replicas) if replicas else None
+
+    async def engine_for_read(self, session: AsyncSession) -> AsyncEngine | None:
+        if not self.replicas or session.info.get("primary") or _primary_reads.get():
+            return None
+        for _ in range(len(self.replicas)):
+            replica = next(self._cycle)
+            await self._ensure_checked(replica)
+            if replica.lag is not None and replica.lag <= self.max_lag:
+                return replica.engine
+        db_replica_fallbacks_total.inc()
+        return None
+
+    async def _ensure_checked(self, replica: Replica) -> None:
+        if time.monotonic() - replica.checked_at < self.check_interval:
+            return
+        if replica._check is None or replica._check.done():
+            replica._check = asyncio.create_task(replica.refresh_lag())
+        if replica.checked_at == 0.0:
+            # never checked yet: wait for the first result instead of guessing
+            await asyncio.shield(replica._check)
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+def pin_to_primary(session: AsyncSession) -> None:
+    session.info["primary"] = True
+
+
+def mark_written(session: AsyncSession) -> None:
+    pin_to_primary(session)
+
+
+@contextmanager
+def read_from_primary() -> Iterator[None]:
+    """Keep reads in the block, and tasks started from it, off the replicas."""
+    token = _primary_reads.set(True)
+    try:
+        yield
+    finally:
+        _primary_reads.reset(token)
@@ -0,0 +1,151 @@
+import uuid
+from collections import OrderedDict
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Mapper
+from sqlalchemy.sql.util import find_tables
+
+# user-owned tables (by schema-qualified name), hash-partitioned by user_id
+SHARDED_TABLES = frozenset({
+    "incomes",
+    "expencies",
+    "archive.incomes",
+    "archive.expencies",
+    "income_types",
+    "expense_types",
+    "profiles",
+    "refresh_sessions",
+    "statements",
+    "daily_balances",
+})
+# exist on every database and are written in the same transaction as the rows
+# they describe, so they follow the session's shard when it has one
+SHARD_LOCAL_TABLES = frozenset({"outbox_events", "sync_tombstones", "sync_horizon"})
+
+
+PLACEMENT_QUERY = text('SELECT shard FROM "user" WHERE id = :user_id')
+HIGHEST_PLACEMENT_QUERY = text('SELECT max(shard) FROM "user"')
+# a single-row table on every shard database
+STAMP_IDENTITY = text(
+    "INSERT INTO shard_identity (id, shard) VALUES (1, :shard) ON CONFLICT (id) DO NOTHING"
+)
+IDENTITY_QUERY = text("SELECT shard FROM shard_identity WHERE id = 1")
+
+
+class ShardNotSelectedError(Exception):
+    pass
+
+
+class ShardTopologyError(Exception):
+    pass
+
+
+def jump_hash(key: int, buckets: int) -> int:
+    """Jump consistent hash: growing N -> N+1 shards only moves 1/(N+1) of the keys."""
+    b, j = -1, 0
+    while j < buckets:
+        b = j
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        j = int((b + 1) * (float(1 << 31) / float((key >> 33) + 1)))
+    return b
+
+
+def touched_tables(mapper: Mapper | None, clause: Any) -> set[str]:
+    tables = set()
+    if mapper is not None:
+        tables.add(mapper.local_table.fullname)
+    if clause is not None:
+        tables.update(
+            table.fullname for table in find_tables(clause, include_crud=True)
+            if hasattr(table, "fullname")
+        )
+    return tables
+
+
+class ShardRouter:
+    """Maps a user to the shard holding their rows; disabled without shards.
+
+    A shard is chosen once, at registration, and stored in `user.shard` on the
+    control database, so adding hosts never moves existing users. Placements
+    never change afterwards and are cached in-process.
+    """
+
+    def __init__(
+        self,
+        engines: list[AsyncEngine],
+        control: AsyncEngine | None = None,
+        cache_size: int = 100_000
+    ) -> None:
+        self.engines = engines
+        self.control = control
+        self.cache_size = cache_size
+        self._placements: OrderedDict[uuid.UUID, int] = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.engines)
+
+    def place(self, user_id: uuid.UUID | str) -> int | None:
+        """Shard for a user being registered."""
+        if not self.engines:
+            return None
+        return jump_hash(_as_uuid(user_id).int & 0xFFFFFFFFFFFFFFFF, len(self.engines))
+
+    async def shard_for(
+        self, user_id: uuid.UUID | str, control: AsyncEngine | None = None
+    ) -> int | None:
+        """The registered user's shard; `control` overrides the engine it is read with."""
+        if not self.engines:
+            return None
+        user_id = _as_uuid(user_id)
+        shard = self._placements.get(user_id)
+        if shard is not None:
+            self._placements.move_to_end(user_id)
+            return shard
+        async with (control or self.control).connect() as connection:
+            shard = await connection.scalar(PLACEMENT_QUERY, {"user_id": user_id})
+        if shard is None:
+            raise ShardNotSelectedError(f"user {user_id} has no shard placement")
+        self._placements[user_id] = shard
+        if len(self._placements) > self.cache_size:
+            self._placements.popitem(last=False)
+        return shard
+
+    async def verify(self) -> None:
+        """Refuse to start when DB_SHARD_HOSTS no longer matches the placed users.
+
+        Every shard database records its own index on first start; a host list
+        that was reordered, or shortened below a shard still holding users,
+        would send placed users to the wrong database.
+        """
+        if not self.engines:
+            return
+        for index, engine in enumerate(self.engines):
+            async with engine.begin() as connection:
+                await connection.execute(STAMP_IDENTITY, {"shard": index})
+                stamped = await connection.scalar(IDENTITY_QUERY)
+            if stamped != index:
+                raise ShardTopologyError(
+                    f"DB_SHARD_HOSTS[{index}] points at shard {stamped}; "
+                    "hosts must keep their order, new ones go at the end"
+                )
+        async with self.control.connect() as connection:
+            highest = await connection.scalar(HIGHEST_PLACEMENT_QUERY)
+        if highest is not None and highest >= len(self.engines):
+            raise ShardTopologyError(
+                f"users are placed on shard {highest} "
+                f"but only {len(self.engines)} shard hosts are configured"
+            )
+
+    def is_sharded(self, table_name: str) -> bool:
+        return self.enabled and (table_name in SHARDED_TABLES or table_name in SHARD_LOCAL_TABLES)
+
+    async def dispose(self) -> None:
+        for engine in self.engines:
+            await engine.dispose()
+
+
+def _as_uuid(user_id: uuid.UUID | str) -> uuid.UUID:
+    return user_id if isinstance(user_id, uuid.UUID) else uuid.UUID(str(user_id))
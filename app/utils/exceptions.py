@@ -48,4 +48,82 @@ class InvalidTokenException(HTTPException):
 
 class InvalidCredentialsException(HTTPException):
     def __init__(self):
-        super().__init__(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid username or password")
\ No newline at end of file
+        super().__init__(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid username or password")
+
+
+class IdempotencyKeyReusedException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency key was already used for a different request"
+        )
+
+
+class IdempotentRequestInProgressException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this idempotency key is still in progress"
+        )
+
+
+class TooManyRequestsException(HTTPException):
+    def __init__(self, retry_after: int):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests",
+            headers={"Retry-After": str(retry_after)}
+        )
+
+
+class StatementNotFoundException(HTTPException):
+    def __init__(self):
+        super().__init__(status_code=status.HTTP_404_NOT_FOUND, detail="Statement not found")
+
+
+class StatementNotReadyException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Statement is not ready yet"
+        )
+
+
+class InvalidBalanceRangeException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="start must not be after end, and the range is limited in length"
+        )
+
+
+class UnknownCurrencyException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Unknown currency"
+        )
+
+
+class InvalidFinanceBatchException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Batch references an unknown currency"
+        )
+
+
+class SyncCursorExpiredException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_410_GONE,
+            detail="Sync cursor is older than the tombstone retention, sync again from 0.0"
+        )
+
+
+class FinanceItemNotCreatedException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Cannot create finance item"
+        )
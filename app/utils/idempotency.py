@@ -0,0 +1,122 @@
+import asyncio
+import hashlib
+import uuid
+from typing import Awaitable, Callable, Type
+
+from app.data.config import settings
+from app.utils.cache import RELEASE_LOCK_SCRIPT
+from app.utils.exceptions import (
+    IdempotencyKeyReusedException,
+    IdempotentRequestInProgressException
+)
+from app.utils.redis import redis_client
+from app.utils.responses import orm_response
+
+from fastapi import Header, Request, Response
+from pydantic import BaseModel
+from redis.exceptions import RedisError
+
+EXTEND_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+class IdempotencyGuard:
+    """Stores the first response for an `Idempotency-Key` and replays it on retries."""
+    _prefix = "idempotency"
+    _poll_interval = 0.05
+    _release_lock = redis_client.register_script(RELEASE_LOCK_SCRIPT)
+    _extend_lock = redis_client.register_script(EXTEND_LOCK_SCRIPT)
+
+    def __init__(self, key: str | None, fingerprint: str) -> None:
+        self.key = key
+        self.fingerprint = fingerprint
+
+    async def run(
+        self,
+        user_id: uuid.UUID,
+        schema: Type[BaseModel],
+        handler: Callable[[], Awaitable[object]]
+    ) -> Response:
+        if not self.key:
+            return orm_response(schema, await handler())
+
+        result_key = f"{self._prefix}:{user_id}:{self.key}"
+        lock_key = f"{result_key}:lock"
+
+        stored = await redis_client.hgetall(result_key)
+        if stored:
+            return self._replay(stored)
+
+        # a token of this attempt's own: the lock may expire under a stalled
+        # handler and be taken by a retry, whose lock must then survive ours
+        token = uuid.uuid4().hex
+        lock_acquired = await redis_client.set(
+            lock_key, token, nx=True, ex=settings.IDEMPOTENCY_LOCK_SECONDS
+        )
+        if not lock_acquired:
+            return await self._wait_for_result(result_key, lock_key)
+
+        keeper = asyncio.create_task(self._keep_lock(lock_key, token))
+        try:
+            stored = await redis_client.hgetall(result_key)
+            if stored:
+                return self._replay(stored)
+            response = orm_response(schema, await handler())
+            async with redis_client.pipeline(transaction=True) as pipe:
+                pipe.hset(
+                    result_key,
+                    mapping={
+                        "fingerprint": self.fingerprint,
+                        "body": response.body.decode()
+                    }
+                )
+                pipe.expire(result_key, settings.IDEMPOTENCY_TTL_SECONDS)
+                await pipe.execute()
+            return response
+        finally:
+            keeper.cancel()
+            await self._release_lock(keys=[lock_key], args=[token])
+
+    async def _keep_lock(self, lock_key: str, token: str) -> None:
+        """Extend the lock while the handler runs, however long that takes."""
+        while True:
+            await asyncio.sleep(settings.IDEMPOTENCY_LOCK_SECONDS / 3)
+            try:
+                if not await self._extend_lock(
+                    keys=[lock_key], args=[token, settings.IDEMPOTENCY_LOCK_SECONDS]
+                ):
+                    return
+            except RedisError:
+                continue
+
+    async def _wait_for_result(self, result_key: str, lock_key: str) -> Response:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.IDEMPOTENCY_LOCK_SECONDS
+        while loop.time() < deadline:
+            await asyncio.sleep(self._poll_interval)
+            stored = await redis_client.hgetall(result_key)
+            if stored:
+                return self._replay(stored)
+            if not await redis_client.exists(lock_key):
+                break
+        raise IdempotentRequestInProgressException
+
+    def _replay(self, stored: dict[str, str]) -> Response:
+        if stored["fingerprint"] != self.fingerprint:
+            raise IdempotencyKeyReusedException
+        return Response(content=stored["body"], media_type="application/json")
+
+
+async def get_idempotency_guard(
+    request: Request,
+    idempotency_key: str | None = Header(None, max_length=255),
+) -> IdempotencyGuard:
+    body = await request.body()
+    fingerprint = hashlib.sha256(
+        request.method.encode() + request.url.path.encode() + body
+    ).hexdigest()
+    return IdempotencyGuard(idempotency_key, fingerprint)
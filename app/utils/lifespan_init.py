@@ -2,20 +2,30 @@ from contextlib import asynccontextmanager
 
 from app.data.config import settings
 from app.finance.service import FinanceService
+from app.outbox.relay import outbox_relays
+from app.utils.loop_monitor import loop_monitor
+from app.utils.database.database import replica_router, shard_router
+from app.utils.cache import service_cache
+from app.utils.redis import redis_manager
 
 from fastapi import FastAPI
-from fastapi_cache import FastAPICache
-from fastapi_cache.backends.redis import RedisBackend
-from fastapi_cache.decorator import cache
-from redis import asyncio as aioredis
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    redis = aioredis.from_url(
-        url=settings.REDIS_URL, encoding="utf8", decode_responses=True
-    )
-    FastAPICache.init(RedisBackend(redis), prefix="fastapi-cache")
-
+    await shard_router.verify()
+    loop_monitor.start()
+    service_cache.start()
     await FinanceService.init_currencies()
+    if settings.OUTBOX_RELAY_ENABLED:
+        for outbox_relay in outbox_relays:
+            outbox_relay.start()
     yield
+    for outbox_relay in outbox_relays:
+        await outbox_relay.stop()
+    await service_cache.stop()
+    await FinanceService.close_coalescers()
+    await replica_router.dispose()
+    await shard_router.dispose()
+    await redis_manager.close(settings.REDIS_CLOSE_TIMEOUT_SECONDS)
+    await loop_monitor.stop()
@@ -0,0 +1,105 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+
+from prometheus_client import Counter, Histogram
+
+from app.data.config import settings
+
+logger = logging.getLogger(__name__)
+
+event_loop_lag_seconds = Histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop woke a sleeping task",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+)
+event_loop_blocked_total = Counter(
+    "event_loop_blocked_total", "Stalls longer than the slow-callback threshold"
+)
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes a sleeping task, i.e. scheduling lag.
+
+    With `slow_callback` set, a watchdog thread also dumps the loop thread's
+    stack while it is blocked for longer than that many seconds, which points
+    at the offending callback itself rather than at its victims.
+    """
+
+    def __init__(self, interval: float = 0.1, slow_callback: float | None = None) -> None:
+        self.interval = interval
+        self.slow_callback = slow_callback
+        self.lag = 0.0
+        self._task: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopped = threading.Event()
+        self._beat = time.monotonic()
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._beat = time.monotonic()
+        self._task = asyncio.create_task(self._run())
+        if self.slow_callback is not None:
+            self._stopped.clear()
+            self._watchdog = threading.Thread(
+                target=self._watch,
+                args=(threading.get_ident(),),
+                name="loop-watchdog",
+                daemon=True
+            )
+            self._watchdog.start()
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopped.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._watchdog = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.lag = max(0.0, loop.time() - started - self.interval)
+            self._beat = time.monotonic()
+            event_loop_lag_seconds.observe(self.lag)
+
+    def _watch(self, loop_thread_id: int) -> None:
+        reported_beat = None
+        while not self._stopped.wait(self.slow_callback / 2):
+            beat = self._beat
+            blocked = time.monotonic() - beat - self.interval
+            if blocked < self.slow_callback or beat == reported_beat:
+                continue
+            # one report per stall, taken while the loop thread is still stuck
+            reported_beat = beat
+            frame = sys._current_frames().get(loop_thread_id)
+            if frame is None:
+                continue
+            event_loop_blocked_total.inc()
+            logger.warning(
+                "event loop blocked",
+                extra={
+                    "blocked_ms": round(blocked * 1000),
+                    "stack": "".join(traceback.format_stack(frame)),
+                }
+            )
+
+
+loop_monitor = LoopLagMonitor(
+    settings.LOOP_LAG_SAMPLE_INTERVAL_MS / 1000,
+    slow_callback=(
+        settings.LOOP_SLOW_CALLBACK_MS / 1000
+        if settings.LOOP_SLOW_CALLBACK_DETECTOR else None
+    )
+)
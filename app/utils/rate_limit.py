@@ -0,0 +1,118 @@
+import math
+import time
+from typing import Literal
+
+from app.data.config import settings
+from app.utils.exceptions import TooManyRequestsException
+from app.utils.redis import redis_client
+
+from fastapi import Request
+from jose import jwt
+from redis.exceptions import RedisError
+
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(retry_after)
+"""
+
+token_bucket = redis_client.register_script(TOKEN_BUCKET_SCRIPT)
+
+
+class LocalTokenBuckets:
+    """In-process token buckets used while redis is unavailable."""
+    max_buckets = 10_000
+
+    def __init__(self) -> None:
+        self._buckets: dict[str, tuple[float, float]] = {}
+
+    def take(self, key: str, capacity: int, rate: float) -> float:
+        now = time.monotonic()
+        tokens, ts = self._buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - ts) * rate)
+        retry_after = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            retry_after = (1 - tokens) / rate
+        if len(self._buckets) >= self.max_buckets and key not in self._buckets:
+            self._buckets.clear()
+        self._buckets[key] = (tokens, now)
+        return retry_after
+
+
+local_buckets = LocalTokenBuckets()
+
+
+class RateLimiter:
+    """Token bucket dependency: `capacity` requests per `period` seconds.
+
+    Limits can be overridden per bucket name with the RATE_LIMITS setting,
+    e.g. RATE_LIMITS='{"login": "10/60"}'.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        capacity: int,
+        period: int,
+        by: Literal["ip", "user"] = "ip"
+    ) -> None:
+        self.name = name
+        self.by = by
+        override = settings.RATE_LIMITS.get(name)
+        if override:
+            capacity, period = map(int, override.split("/"))
+        self.capacity = capacity
+        self.rate = capacity / period
+
+    async def __call__(self, request: Request) -> None:
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        key = f"rate_limit:{self.name}:{self._identity(request)}"
+        try:
+            retry_after = float(
+                await token_bucket(keys=[key], args=[self.capacity, self.rate])
+            )
+        except RedisError:
+            retry_after = local_buckets.take(key, self.capacity, self.rate)
+        if retry_after > 0:
+            raise TooManyRequestsException(math.ceil(retry_after))
+
+    def _identity(self, request: Request) -> str:
+        if self.by == "user":
+            user_id = self._user_id_from_cookie(request)
+            if user_id:
+                return f"user:{user_id}"
+        return f"ip:{request.client.host if request.client else 'unknown'}"
+
+    @staticmethod
+    def _user_id_from_cookie(request: Request) -> str | None:
+        authorization = request.cookies.get("access_token")
+        if not authorization:
+            return None
+        try:
+            payload = jwt.decode(
+                authorization.removeprefix("Bearer "),
+                settings.SECRET_AUTH,
+                algorithms=[settings.ALGORITHM]
+            )
+        except Exception:
+            return None
+        return payload.get("sub")
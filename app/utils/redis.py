@@ -0,0 +1,113 @@
+import asyncio
+import time
+from typing import Any, Iterable
+
+from app.data.config import settings
+
+from prometheus_client import Gauge, Histogram
+from redis import asyncio as aioredis
+from redis.asyncio.client import Pipeline
+
+redis_command_seconds = Histogram(
+    "redis_command_seconds",
+    "Redis round trip latency per command, pipelines count as one round trip",
+    ["command"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+)
+redis_pool_connections_in_use = Gauge(
+    "redis_pool_connections_in_use", "Connections checked out of the shared Redis pool"
+)
+
+
+class InstrumentedPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        started = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            redis_command_seconds.labels(
+                command="MULTI" if self.is_transaction else "PIPELINE"
+            ).observe(time.perf_counter() - started)
+
+
+class InstrumentedRedis(aioredis.Redis):
+    async def execute_command(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            redis_command_seconds.labels(command=str(args[0]).upper()).observe(
+                time.perf_counter() - started
+            )
+
+    def pipeline(self, transaction: bool = True, shard_hint: str | None = None) -> Pipeline:
+        return InstrumentedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+
+class RedisManager:
+    """Owns the one Redis connection pool shared by cache, limits, idempotency and outbox."""
+
+    def __init__(
+        self,
+        url: str,
+        max_connections: int = 50,
+        pool_timeout: float = 5.0,
+        socket_timeout: float = 5.0
+    ) -> None:
+        self.pool = aioredis.BlockingConnectionPool.from_url(
+            url,
+            max_connections=max_connections,
+            timeout=pool_timeout,
+            socket_timeout=socket_timeout,
+            socket_connect_timeout=socket_timeout,
+            encoding="utf8",
+            decode_responses=True
+        )
+        self.client = InstrumentedRedis(connection_pool=self.pool)
+        redis_pool_connections_in_use.set_function(
+            lambda: len(self.pool._in_use_connections)
+        )
+
+    async def get_many(self, keys: Iterable[str]) -> list[str | None]:
+        keys = list(keys)
+        if not keys:
+            return []
+        return await self.client.mget(keys)
+
+    async def set_many(self, mapping: dict[str, Any], ex: int | None = None) -> None:
+        if not mapping:
+            return
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key, value in mapping.items():
+                pipe.set(key, value, ex=ex)
+            await pipe.execute()
+
+    async def hgetall_many(self, keys: Iterable[str]) -> list[dict[str, str]]:
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.hgetall(key)
+            return await pipe.execute()
+
+    async def delete_many(self, keys: Iterable[str]) -> int:
+        keys = list(keys)
+        if not keys:
+            return 0
+        return await self.client.unlink(*keys)
+
+    async def close(self, timeout: float = 5.0) -> None:
+        # let in-flight commands hand their connections back before closing them
+        deadline = time.monotonic() + timeout
+        while self.pool._in_use_connections and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        await self.client.aclose(close_connection_pool=True)
+
+
+redis_manager = RedisManager(
+    settings.REDIS_URL,
+    max_connections=settings.REDIS_MAX_CONNECTIONS,
+    pool_timeout=settings.REDIS_POOL_TIMEOUT_SECONDS,
+    socket_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS
+)
+redis_client = redis_manager.client
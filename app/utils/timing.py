@@ -0,0 +1,134 @@
+import hmac
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from prometheus_client import Histogram
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.data.config import settings
+
+request_phase_seconds = Histogram(
+    "request_phase_seconds",
+    "Time spent per request phase, summed over the request",
+    ["phase"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+
+_timings: ContextVar[dict[str, float] | None] = ContextVar("timings", default=None)
+
+
+def record(name: str, seconds: float) -> None:
+    timings = _timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - started)
+
+
+class PoolPressure:
+    """Checkout waiters right now and a smoothed recent checkout wait, across pools."""
+
+    def __init__(self, alpha: float = 0.2, stale_after: float = 5.0) -> None:
+        self.alpha = alpha
+        self.stale_after = stale_after
+        self.waiting = 0
+        self._wait = 0.0
+        self._updated = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self._wait += self.alpha * (seconds - self._wait)
+        self._updated = time.monotonic()
+
+    @property
+    def recent_wait(self) -> float:
+        # without fresh checkouts an old spike must not keep the pool looking busy
+        if time.monotonic() - self._updated > self.stale_after:
+            return 0.0
+        return self._wait
+
+
+pool_pressure = PoolPressure()
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """Records how long each checkout waited for a free connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        pool_pressure.waiting += 1
+        try:
+            return super()._do_get()
+        finally:
+            pool_pressure.waiting -= 1
+            waited = time.perf_counter() - started
+            pool_pressure.observe(waited)
+            record("pool", waited)
+
+
+def instrument_sql_timing(engine: AsyncEngine) -> None:
+    # the start lives on the execution context, not the pooled connection: a
+    # failing statement never reaches after_cursor_execute and would leave it behind
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def start_statement(conn, cursor, statement, parameters, context, executemany):
+        context._timing_started = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def end_statement(conn, cursor, statement, parameters, context, executemany):
+        record("sql", time.perf_counter() - context._timing_started)
+
+
+def _wants_header(scope: Scope) -> bool:
+    if settings.SERVER_TIMING_DEBUG:
+        return True
+    token = settings.SERVER_TIMING_TOKEN
+    if not token:
+        return False
+    sent = Headers(scope=scope).get("x-server-timing-token", "")
+    return hmac.compare_digest(sent.encode(), token.encode())
+
+
+class ServerTimingMiddleware:
+    """Collects `phase()` durations per request into Prometheus and, on demand, `Server-Timing`."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings: dict[str, float] = {}
+        token = _timings.set(timings)
+        started = time.perf_counter()
+        emit_header = _wants_header(scope)
+
+        async def send_with_timings(message: Message) -> None:
+            if message["type"] == "http.response.start" and emit_header:
+                entries = [
+                    f"{name};dur={seconds * 1000:.2f}" for name, seconds in timings.items()
+                ]
+                entries.append(f"app;dur={(time.perf_counter() - started) * 1000:.2f}")
+                MutableHeaders(scope=message).append("Server-Timing", ", ".join(entries))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timings)
+        finally:
+            _timings.reset(token)
+            timings["total"] = time.perf_counter() - started
+            for name, seconds in timings.items():
+                request_phase_seconds.labels(phase=name).observe(seconds)
@@ -0,0 +1,47 @@
+"""Time the spending analytics engine on synthetic histories.
+
+Covers building the columnar arrays from streamed chunks and computing the
+metrics. Run from the project root:  python -m benchmarks.analytics
+"""
+import time
+
+import numpy as np
+
+from app.finance.analytics import TransactionColumnsBuilder, spending_analytics
+
+SIZES = (10_000, 100_000, 1_000_000)
+CHUNK_SIZE = 10_000
+CATEGORIES = ["Food", "Health", "Transport", "Beauty", "Apparel", "Education", "Pets", "Other"]
+
+
+def make_chunks(n: int, rng: np.random.Generator) -> list[list[tuple[int, int, str]]]:
+    start = 1_600_000_000
+    timestamps = np.sort(rng.integers(start, start + 5 * 365 * 86400, n)).tolist()
+    amounts = rng.integers(100, 50_000, n).tolist()
+    categories = rng.choice(CATEGORIES, n).tolist()
+    rows = list(zip(timestamps, amounts, categories))
+    return [rows[i:i + CHUNK_SIZE] for i in range(0, n, CHUNK_SIZE)]
+
+
+def main() -> None:
+    rng = np.random.default_rng(42)
+    for n in SIZES:
+        chunks = make_chunks(n, rng)
+
+        started = time.perf_counter()
+        builder = TransactionColumnsBuilder()
+        for chunk in chunks:
+            builder.add_chunk(chunk)
+        columns = builder.build()
+        built = time.perf_counter()
+        spending_analytics(columns)
+        finished = time.perf_counter()
+
+        print(
+            f"{n:>9} rows: build {(built - started) * 1000:8.1f} ms, "
+            f"metrics {(finished - built) * 1000:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
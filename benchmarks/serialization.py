@@ -0,0 +1,73 @@
+"""Compare the default FastAPI response path with `orm_response`.
+
+Run from the project root:  python -m benchmarks.serialization
+"""
+import timeit
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.auth.models import UserModel  # noqa: F401, registers the related mappers
+from app.finance.models import CurrencyModel, IncomeModel
+from app.finance.schemas import Currency, FinanceItem
+from app.utils.responses import orm_response
+
+ROWS = 1_000
+REPEAT = 20
+
+
+def make_finance_items(n: int) -> list[IncomeModel]:
+    user_id = uuid.uuid4()
+    created_at = datetime.now(timezone.utc)
+    return [
+        IncomeModel(
+            id=uuid.uuid4(),
+            user_id=user_id,
+            currency_code="USD",
+            category="Salary",
+            value=Decimal("1234.56"),
+            comment=f"comment {i}",
+            created_at=created_at
+        )
+        for i in range(n)
+    ]
+
+
+def make_currencies(n: int) -> list[CurrencyModel]:
+    return [
+        CurrencyModel(currency_code=f"C{i % 100:02d}", symbol="$", name=f"Currency {i}")
+        for i in range(n)
+    ]
+
+
+def fastapi_default(adapter: TypeAdapter, rows) -> bytes:
+    # what FastAPI 0.103 does with pydantic v2 for `-> list[schema]`: validate the
+    # ORM rows against the response field, dump them in json mode, JSONResponse
+    items = adapter.validate_python(rows, from_attributes=True)
+    return JSONResponse(adapter.dump_python(items, mode="json")).body
+
+
+def fast_path(schema, rows) -> bytes:
+    return orm_response(schema, rows).body
+
+
+def main() -> None:
+    for name, schema, rows in (
+        ("FinanceItem", FinanceItem, make_finance_items(ROWS)),
+        ("Currency", Currency, make_currencies(ROWS)),
+    ):
+        # FastAPI builds the response field's adapter once per route
+        adapter = TypeAdapter(list[schema])
+        for label, call in (
+            ("fastapi default", lambda: fastapi_default(adapter, rows)),
+            ("orm_response", lambda: fast_path(schema, rows)),
+        ):
+            seconds = min(timeit.repeat(call, number=1, repeat=REPEAT))
+            print(f"{name:<12} {label:<16} {ROWS} rows: {seconds * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
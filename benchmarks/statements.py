@@ -0,0 +1,46 @@
+"""Per-call CPU of building a lookup statement versus reusing a prebuilt one.
+
+Measures what SQLAlchemy does on every execute before it can hit the compiled
+cache: build the construct and generate its cache key.
+
+Run from the project root:  python -m benchmarks.statements
+"""
+import timeit
+import uuid
+
+from sqlalchemy import bindparam, select
+
+from app.auth.models import RefreshSessionModel, UserModel
+from app.finance.models import ExpenseTypeModel
+
+NUMBER = 20_000
+
+LOOKUPS = [
+    ("user by id", UserModel, "id", uuid.uuid4()),
+    ("user by email", UserModel, "email", "user@example.com"),
+    ("refresh session by token", RefreshSessionModel, "refresh_token", uuid.uuid4()),
+    ("type row by user_id", ExpenseTypeModel, "user_id", uuid.uuid4()),
+]
+
+
+def main() -> None:
+    for name, model, column, value in LOOKUPS:
+        def rebuilt():
+            stmt = select(model).filter().filter_by(**{column: value})
+            return stmt._generate_cache_key()
+
+        prebuilt_stmt = select(model).where(getattr(model, column) == bindparam("value"))
+
+        def prebuilt():
+            return prebuilt_stmt._generate_cache_key()
+
+        rebuilt_us = min(timeit.repeat(rebuilt, number=NUMBER, repeat=5)) / NUMBER * 1e6
+        prebuilt_us = min(timeit.repeat(prebuilt, number=NUMBER, repeat=5)) / NUMBER * 1e6
+        print(
+            f"{name:<26} rebuilt {rebuilt_us:7.2f} us/call  "
+            f"prebuilt {prebuilt_us:6.2f} us/call  saved {rebuilt_us - prebuilt_us:6.2f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
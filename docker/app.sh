@@ -1,5 +1,6 @@
 #!/bin/bash
 
 alembic upgrade head 
+alembic -n shards upgrade head
 
 gunicorn app.main:app --workers 4 --worker-class uvicorn.workers.UvicornWorker --bind=0.0.0.0:8000
\ No newline at end of file
@@ -5,8 +5,13 @@ from app.data.config import settings
 
 from app.utils.database.database import Base
 
+from app.archive.models import ArchivedIncomeModel
 from app.auth.models import RefreshSessionModel, UserModel
+from app.balances.models import DailyBalanceModel
 from app.finance.models import CurrencyModel
+from app.outbox.models import OutboxEventModel
+from app.statements.models import StatementModel
+from app.sync.models import SyncTombstoneModel
 
 from sqlalchemy import pool
 from sqlalchemy.engine import Connection
@@ -52,6 +57,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_schemas=True,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -61,7 +67,9 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection, target_metadata=target_metadata, include_schemas=True
+    )
 
     with context.begin_transaction():
         context.run_migrations()
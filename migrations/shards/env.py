@@ -0,0 +1,82 @@
+import asyncio
+from logging.config import fileConfig
+
+from app.data.config import settings
+
+from app.utils.database.database import Base
+from app.utils.database.shards import SHARD_LOCAL_TABLES, SHARDED_TABLES
+
+from app.archive.models import ArchivedIncomeModel
+from app.auth.models import RefreshSessionModel, UserModel
+from app.balances.models import DailyBalanceModel
+from app.finance.models import CurrencyModel
+from app.outbox.models import OutboxEventModel
+from app.statements.models import StatementModel
+from app.sync.models import SyncTombstoneModel
+
+from sqlalchemy import pool
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from alembic import context
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+SHARD_TABLES = SHARDED_TABLES | SHARD_LOCAL_TABLES
+
+
+def include_object(object, name, type_, reflected, compare_to) -> bool:
+    """Autogenerate only sees shard tables, and no foreign keys into the control database."""
+    if type_ == "table":
+        return object.fullname in SHARD_TABLES
+    if type_ == "foreign_key_constraint":
+        return object.referred_table.fullname in SHARD_TABLES
+    return True
+
+
+def run_migrations_offline() -> None:
+    # the same script applies to every shard
+    context.configure(
+        url=settings.DATABASE_URL,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        include_schemas=True,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def do_run_migrations(connection: Connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        include_schemas=True
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_async_migrations() -> None:
+    for url in settings.DATABASE_SHARD_URLS:
+        connectable = create_async_engine(url, poolclass=pool.NullPool)
+        async with connectable.connect() as connection:
+            await connection.run_sync(do_run_migrations)
+        await connectable.dispose()
+
+
+def run_migrations_online() -> None:
+    asyncio.run(run_async_migrations())
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,32 @@
+"""Shard identity
+
+Revision ID: 4438cbc835bf
+Revises: f6e77dbcb347
+Create Date: 2026-10-20 11:27:15.902361
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4438cbc835bf'
+down_revision: Union[str, None] = 'f6e77dbcb347'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # one row, stamped with the database's index in DB_SHARD_HOSTS on first start
+    op.create_table('shard_identity',
+    sa.Column('id', sa.SmallInteger(), autoincrement=False, nullable=False),
+    sa.Column('shard', sa.SmallInteger(), nullable=False),
+    sa.CheckConstraint('id = 1', name='ck_shard_identity_single_row'),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('shard_identity')
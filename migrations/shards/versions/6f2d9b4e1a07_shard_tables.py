@@ -0,0 +1,167 @@
+"""Shard tables
+
+Revision ID: 6f2d9b4e1a07
+Revises: 
+Create Date: 2026-10-19 18:07:31.402915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6f2d9b4e1a07'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# the control database's schema up to 3b8d5f1a7c42, minus `user`, `currencies`
+# and every foreign key into them
+TRACKED_TABLES = ['profiles', 'incomes', 'expencies', 'income_types', 'expense_types']
+TOMBSTONED_TABLES = {
+    'incomes': 'id',
+    'expencies': 'id',
+    'profiles': 'user_id',
+}
+
+
+def change_columns() -> list[sa.Column]:
+    return [
+        sa.Column('change_version', sa.BigInteger(), server_default=sa.text("nextval('change_version_seq')"), nullable=False),
+        sa.Column('change_xid', sa.BigInteger(), server_default=sa.text('pg_current_xact_id()::text::bigint'), nullable=False),
+    ]
+
+
+def upgrade() -> None:
+    op.execute("CREATE SEQUENCE change_version_seq")
+    for table in ('expencies', 'incomes'):
+        op.create_table(table,
+        sa.Column('comment', sa.Text(), nullable=False),
+        sa.Column('value', sa.Numeric(), nullable=False),
+        sa.Column('category', sa.String(), nullable=False),
+        sa.Column('currency_code', sa.String(length=3), nullable=False),
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+        *change_columns(),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f(f'ix_{table}_id'), table, ['id'], unique=False)
+        op.create_index(f'ix_{table}_user_id_created_at', table, ['user_id', 'created_at'], unique=False)
+        op.create_index(f'ix_{table}_user_id_change_version', table, ['user_id', 'change_version'], unique=False)
+    for table in ('expense_types', 'income_types'):
+        op.create_table(table,
+        sa.Column('categories', sa.ARRAY(sa.String()), nullable=False),
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        *change_columns(),
+        sa.PrimaryKeyConstraint('user_id')
+        )
+    op.create_table('profiles',
+    sa.Column('username', sa.String(length=32), nullable=True),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('currency_code', sa.String(length=3), nullable=False),
+    *change_columns(),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_table('refresh_sessions',
+    sa.Column('refresh_token', sa.Uuid(), nullable=False),
+    sa.Column('expires_in', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_refresh_sessions_id'), 'refresh_sessions', ['id'], unique=False)
+    op.create_index(op.f('ix_refresh_sessions_refresh_token'), 'refresh_sessions', ['refresh_token'], unique=False)
+    op.create_table('statements',
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.Column('period', sa.String(length=8), nullable=False),
+    sa.Column('period_start', sa.Date(), nullable=False),
+    sa.Column('format', sa.String(length=8), nullable=False),
+    sa.Column('data_version', sa.BigInteger(), nullable=False),
+    sa.Column('status', sa.String(length=16), nullable=False),
+    sa.Column('artifact', sa.String(length=255), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('completed_at', sa.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'period', 'period_start', 'format', 'data_version', name='uq_statements_request')
+    )
+    op.create_index(op.f('ix_statements_id'), 'statements', ['id'], unique=False)
+    op.create_index(op.f('ix_statements_user_id'), 'statements', ['user_id'], unique=False)
+    op.create_table('sync_tombstones',
+    *change_columns(),
+    sa.Column('table_name', sa.String(length=32), nullable=False),
+    sa.Column('row_id', sa.String(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('deleted_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('change_version')
+    )
+    op.create_index('ix_sync_tombstones_user_id_change_version', 'sync_tombstones', ['user_id', 'change_version'], unique=False)
+    op.create_table('outbox_events',
+    sa.Column('id', sa.BigInteger(), sa.Identity(always=False), nullable=False),
+    sa.Column('stream', sa.String(length=64), nullable=False),
+    sa.Column('event_type', sa.String(length=64), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+    op.execute("""
+        CREATE FUNCTION track_change() RETURNS trigger AS $$
+        BEGIN
+            NEW.change_version := nextval('change_version_seq');
+            NEW.change_xid := pg_current_xact_id()::text::bigint;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE FUNCTION track_delete() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO sync_tombstones (table_name, row_id, user_id)
+            VALUES (TG_TABLE_NAME, to_jsonb(OLD) ->> TG_ARGV[0], OLD.user_id);
+            RETURN OLD;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    for table in TRACKED_TABLES:
+        op.execute(
+            f'CREATE TRIGGER {table}_track_change BEFORE UPDATE ON "{table}" '
+            'FOR EACH ROW EXECUTE FUNCTION track_change()'
+        )
+    for table, row_id in TOMBSTONED_TABLES.items():
+        op.execute(
+            f'CREATE TRIGGER {table}_track_delete AFTER DELETE ON "{table}" '
+            f"FOR EACH ROW EXECUTE FUNCTION track_delete('{row_id}')"
+        )
+
+
+def downgrade() -> None:
+    for table in TOMBSTONED_TABLES:
+        op.execute(f'DROP TRIGGER {table}_track_delete ON "{table}"')
+    for table in TRACKED_TABLES:
+        op.execute(f'DROP TRIGGER {table}_track_change ON "{table}"')
+    op.execute("DROP FUNCTION track_delete()")
+    op.execute("DROP FUNCTION track_change()")
+    op.drop_table('outbox_events')
+    op.drop_index('ix_sync_tombstones_user_id_change_version', table_name='sync_tombstones')
+    op.drop_table('sync_tombstones')
+    op.drop_index(op.f('ix_statements_user_id'), table_name='statements')
+    op.drop_index(op.f('ix_statements_id'), table_name='statements')
+    op.drop_table('statements')
+    op.drop_index(op.f('ix_refresh_sessions_refresh_token'), table_name='refresh_sessions')
+    op.drop_index(op.f('ix_refresh_sessions_id'), table_name='refresh_sessions')
+    op.drop_table('refresh_sessions')
+    op.drop_table('profiles')
+    op.drop_table('income_types')
+    op.drop_table('expense_types')
+    for table in ('incomes', 'expencies'):
+        op.drop_index(f'ix_{table}_user_id_change_version', table_name=table)
+        op.drop_index(f'ix_{table}_user_id_created_at', table_name=table)
+        op.drop_index(op.f(f'ix_{table}_id'), table_name=table)
+        op.drop_table(table)
+    op.execute("DROP SEQUENCE change_version_seq")
@@ -0,0 +1,36 @@
+"""Archive change version
+
+Revision ID: 9ff4607e5d87
+Revises: 4438cbc835bf
+Create Date: 2026-10-20 12:04:51.630428
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9ff4607e5d87'
+down_revision: Union[str, None] = '4438cbc835bf'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ARCHIVED_TABLES = ['incomes', 'expencies']
+
+
+def upgrade() -> None:
+    for table in ARCHIVED_TABLES:
+        op.add_column(table, sa.Column('change_version', sa.BigInteger(), nullable=True), schema='archive')
+        # the versions of rows archived so far are gone: give them new ones, so no
+        # user's data version ends up below one a statement was already built for
+        op.execute(f"UPDATE archive.{table} SET change_version = nextval('change_version_seq')")
+        op.alter_column(table, 'change_version', nullable=False, schema='archive')
+        op.create_index(f'ix_archive_{table}_user_id_change_version', table, ['user_id', 'change_version'], unique=False, schema='archive')
+
+
+def downgrade() -> None:
+    for table in ARCHIVED_TABLES:
+        op.drop_index(f'ix_archive_{table}_user_id_change_version', table_name=table, schema='archive')
+        op.drop_column(table, 'change_version', schema='archive')
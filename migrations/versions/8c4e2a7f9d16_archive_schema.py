@@ -0,0 +1,65 @@
+"""Archive schema
+
+Revision ID: 8c4e2a7f9d16
+Revises: 3b8d5f1a7c42
+Create Date: 2026-10-19 19:12:45.608217
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4e2a7f9d16'
+down_revision: Union[str, None] = '3b8d5f1a7c42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ARCHIVED_TABLES = ['incomes', 'expencies']
+
+TRACK_DELETE = """
+    CREATE OR REPLACE FUNCTION track_delete() RETURNS trigger AS $$
+    BEGIN
+        {skip}INSERT INTO sync_tombstones (table_name, row_id, user_id)
+        VALUES (TG_TABLE_NAME, to_jsonb(OLD) ->> TG_ARGV[0], OLD.user_id);
+        RETURN OLD;
+    END;
+    $$ LANGUAGE plpgsql
+"""
+# rows moved by the archival job are not deletions, clients keep them
+SKIP_ARCHIVING = """IF current_setting('app.archiving', true) = 'on' THEN
+            RETURN OLD;
+        END IF;
+        """
+
+
+def upgrade() -> None:
+    op.execute("CREATE SCHEMA IF NOT EXISTS archive")
+    for table in ARCHIVED_TABLES:
+        op.create_table(table,
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column('currency_code', sa.String(length=3), nullable=False),
+        sa.Column('value', sa.Numeric(), nullable=False),
+        sa.Column('category', sa.String(), nullable=False),
+        sa.Column('comment', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column('archived_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        schema='archive'
+        )
+        op.create_index(f'ix_archive_{table}_user_id_created_at', table, ['user_id', 'created_at'], unique=False, schema='archive')
+        op.create_index(f'ix_{table}_created_at_brin', table, ['created_at'], unique=False, postgresql_using='brin')
+    op.execute(TRACK_DELETE.format(skip=SKIP_ARCHIVING))
+
+
+def downgrade() -> None:
+    op.execute(TRACK_DELETE.format(skip=""))
+    for table in ARCHIVED_TABLES:
+        op.drop_index(f'ix_{table}_created_at_brin', table_name=table, postgresql_using='brin')
+        op.drop_index(f'ix_archive_{table}_user_id_created_at', table_name=table, schema='archive')
+        op.drop_table(table, schema='archive')
+    op.execute("DROP SCHEMA archive")
@@ -0,0 +1,92 @@
+"""Sync change tracking
+
+Revision ID: d41b7e0c5a93
+Revises: 9a4f2c6b8e11
+Create Date: 2026-10-19 12:41:07.215604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41b7e0c5a93'
+down_revision: Union[str, None] = '9a4f2c6b8e11'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRACKED_TABLES = ['user', 'profiles', 'incomes', 'expencies', 'income_types', 'expense_types']
+# table -> column identifying the deleted row in its tombstone
+TOMBSTONED_TABLES = {
+    'incomes': 'id',
+    'expencies': 'id',
+    'profiles': 'user_id',
+}
+
+
+def upgrade() -> None:
+    op.execute("CREATE SEQUENCE change_version_seq")
+    for table in TRACKED_TABLES:
+        op.add_column(table, sa.Column('change_version', sa.BigInteger(), server_default=sa.text("nextval('change_version_seq')"), nullable=False))
+        op.add_column(table, sa.Column('change_xid', sa.BigInteger(), server_default=sa.text('pg_current_xact_id()::text::bigint'), nullable=False))
+    op.create_index('ix_incomes_user_id_change_version', 'incomes', ['user_id', 'change_version'], unique=False)
+    op.create_index('ix_expencies_user_id_change_version', 'expencies', ['user_id', 'change_version'], unique=False)
+
+    op.create_table('sync_tombstones',
+    sa.Column('change_version', sa.BigInteger(), server_default=sa.text("nextval('change_version_seq')"), nullable=False),
+    sa.Column('change_xid', sa.BigInteger(), server_default=sa.text('pg_current_xact_id()::text::bigint'), nullable=False),
+    sa.Column('table_name', sa.String(length=32), nullable=False),
+    sa.Column('row_id', sa.String(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('deleted_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('change_version')
+    )
+    op.create_index('ix_sync_tombstones_user_id_change_version', 'sync_tombstones', ['user_id', 'change_version'], unique=False)
+
+    op.execute("""
+        CREATE FUNCTION track_change() RETURNS trigger AS $$
+        BEGIN
+            NEW.change_version := nextval('change_version_seq');
+            NEW.change_xid := pg_current_xact_id()::text::bigint;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE FUNCTION track_delete() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO sync_tombstones (table_name, row_id, user_id)
+            VALUES (TG_TABLE_NAME, to_jsonb(OLD) ->> TG_ARGV[0], OLD.user_id);
+            RETURN OLD;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    for table in TRACKED_TABLES:
+        op.execute(
+            f'CREATE TRIGGER {table}_track_change BEFORE UPDATE ON "{table}" '
+            'FOR EACH ROW EXECUTE FUNCTION track_change()'
+        )
+    for table, row_id in TOMBSTONED_TABLES.items():
+        op.execute(
+            f'CREATE TRIGGER {table}_track_delete AFTER DELETE ON "{table}" '
+            f"FOR EACH ROW EXECUTE FUNCTION track_delete('{row_id}')"
+        )
+
+
+def downgrade() -> None:
+    for table in TOMBSTONED_TABLES:
+        op.execute(f'DROP TRIGGER {table}_track_delete ON "{table}"')
+    for table in TRACKED_TABLES:
+        op.execute(f'DROP TRIGGER {table}_track_change ON "{table}"')
+    op.execute("DROP FUNCTION track_delete()")
+    op.execute("DROP FUNCTION track_change()")
+    op.drop_index('ix_sync_tombstones_user_id_change_version', table_name='sync_tombstones')
+    op.drop_table('sync_tombstones')
+    op.drop_index('ix_expencies_user_id_change_version', table_name='expencies')
+    op.drop_index('ix_incomes_user_id_change_version', table_name='incomes')
+    for table in TRACKED_TABLES:
+        op.drop_column(table, 'change_xid')
+        op.drop_column(table, 'change_version')
+    op.execute("DROP SEQUENCE change_version_seq")